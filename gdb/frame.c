@@ -1836,6 +1836,18 @@ frame_observer_target_changed (struct target_ops *target)
   reinit_frame_cache ();
 }
 
+/* The number of times the frame cache has been flushed.  */
+
+static unsigned long frame_cache_generation;
+
+/* See frame.h.  */
+
+unsigned long
+get_frame_cache_generation (void)
+{
+  return frame_cache_generation;
+}
+
 /* Flush the entire frame cache.  */
 
 void
@@ -1843,6 +1855,8 @@ reinit_frame_cache (void)
 {
   struct frame_info *fi;
 
+  ++frame_cache_generation;
+
   /* Tear down all frame caches.  */
   for (fi = sentinel_frame; fi != NULL; fi = fi->prev)
     {
@@ -314,6 +314,13 @@ extern int has_stack_frames (void);
    modifies the target invalidating the frame cache).  */
 extern void reinit_frame_cache (void);
 
+/* Return a number which changes each time the frame cache is flushed by
+   reinit_frame_cache, which happens whenever the inferior is resumed,
+   another thread is selected or the inferior's registers or memory are
+   modified.  Clients caching information derived from frames can
+   compare it to know whether the information is still valid.  */
+extern unsigned long get_frame_cache_generation (void);
+
 /* On demand, create the selected frame and then return it.  If the
    selected frame can not be created, this function prints then throws
    an error.  When MESSAGE is non-NULL, use it for the error message,
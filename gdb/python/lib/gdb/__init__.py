@@ -146,11 +146,181 @@ packages = [
     'printer'
 ]
 
+# Modules listed in the _lazy_modules manifest of their package are not
+# imported when GDB starts.  Stubs standing for the commands,
+# convenience functions and pretty-printers they define are registered
+# instead, and the module is imported when one of them is first used,
+# or when GDB first displays its prompt.  This keeps the start up of GDB
+# short, notably for batch sessions, which never display a prompt and
+# only import the modules they use.  Interactive sessions get the real
+# commands and functions, with their full documentation, before the
+# user can ask for their help.
+
+# The stubs registered for each module not imported yet, indexed by the
+# name of the module, the modules imported on behalf of their stubs,
+# whose commands are not registered yet, and the function connected to
+# the before_prompt event to import the modules.  These are kept when
+# GdbSetPythonDirectory reloads this module, so that stubs are only
+# registered once.
+if '_lazy_stubs' not in globals():
+    _lazy_stubs = {}
+    _unregistered_modules = set()
+    _lazy_prompt_handler = None
+
+# The name of the module being imported on behalf of a stub.  A command
+# module must not register its commands then: registering a command
+# frees the command it replaces, which GDB may be executing.  Its
+# commands are registered when GDB next displays its prompt.
+_lazy_importing = None
+
+def _import_lazily(modname):
+    """Import the module MODNAME on behalf of one of its stubs, and
+    return it."""
+    global _lazy_importing
+    if modname not in sys.modules:
+        _lazy_importing = modname
+        try:
+            __import__(modname)
+        finally:
+            _lazy_importing = None
+        _unregistered_modules.add(modname)
+    return sys.modules[modname]
+
+class _LazyCommand(Command):
+    """Stand for a command of a module not imported yet."""
+
+    def __init__(self, modname, name, command_class, prefix, classname, doc):
+        self.__doc__ = doc
+        super(_LazyCommand, self).__init__(name, command_class,
+                                           prefix=prefix)
+        self._modname = modname
+        self._classname = classname
+        self._command = None
+
+    def load(self):
+        """Import the module of the command, and register the real
+        command in place of this stub.  This must not be called while
+        GDB executes the stub."""
+        module = _import_lazily(self._modname)
+        if self._modname in _unregistered_modules:
+            getattr(module, self._classname)()
+
+    def invoke(self, arg, from_tty):
+        if self._command is None:
+            command_type = getattr(_import_lazily(self._modname),
+                                   self._classname)
+            # Creating the real command would register it, which would
+            # free this stub while GDB executes it.  This instance is
+            # only used to run the command until the real one replaces
+            # the stub.
+            self._command = command_type.__new__(command_type)
+        self._command.invoke(arg, from_tty)
+
+class _LazyFunction(Function):
+    """Stand for a convenience function of a module not imported yet."""
+
+    def __init__(self, modname, name, doc):
+        self.__doc__ = doc
+        super(_LazyFunction, self).__init__(name)
+        self._modname = modname
+        self._name = name
+
+    def load(self):
+        """Import the module of the function, which registers the real
+        function in place of this stub, and return the real function."""
+        module = _import_lazily(self._modname)
+        function = getattr(module, self._name, None)
+        if not isinstance(function, Function):
+            raise GdbError("Module %s does not define the function $%s."
+                           % (self._modname, self._name))
+        return function
+
+    def invoke(self, *args):
+        return self.load().invoke(*args)
+
+class _LazyPrinter(object):
+    """Stand for the printer generator of a builtin pretty-printer of a
+    module not imported yet."""
+
+    def __init__(self, modname, name):
+        self._modname = modname
+        self._name = name
+        self._gen_printer = None
+
+    def load(self):
+        """Import the module of the pretty-printer, and return its real
+        printer generator."""
+        if self._gen_printer is not None:
+            return self._gen_printer
+        import gdb.printing
+        _import_lazily(self._modname)
+        # The module added its own subprinter.  Move its printer
+        # generator to the subprinter of this stub, which keeps its
+        # place in the list and its enabled state.
+        subprinters = gdb.printing._builtin_pretty_printers.subprinters
+        stub = None
+        real = None
+        for subprinter in subprinters:
+            if subprinter.gen_printer is self:
+                stub = subprinter
+            elif (subprinter.name == self._name
+                  and not isinstance(subprinter.gen_printer, _LazyPrinter)):
+                real = subprinter
+        if real is None:
+            raise GdbError("Module %s does not define the pretty-printer %s."
+                           % (self._modname, self._name))
+        subprinters.remove(real)
+        if stub is not None:
+            stub.gen_printer = real.gen_printer
+        self._gen_printer = real.gen_printer
+        return self._gen_printer
+
+    def __call__(self, val):
+        return self.load()(val)
+
+def _register_lazy_module(package, modname, entries):
+    """Register the stubs of the module MODNAME of PACKAGE, from the
+    ENTRIES of the manifest of PACKAGE."""
+    stubs = []
+    if package == 'command':
+        for name, command_class, prefix, classname, doc in entries:
+            stubs.append(_LazyCommand(modname, name, command_class, prefix,
+                                      classname, doc))
+    elif package == 'function':
+        for name, doc in entries:
+            stubs.append(_LazyFunction(modname, name, doc))
+    elif package == 'printer':
+        import gdb.printing
+        for name, regexp in entries:
+            stub = _LazyPrinter(modname, name)
+            gdb.printing.add_builtin_pretty_printer(name, regexp, stub)
+            stubs.append(stub)
+    _lazy_stubs[modname] = stubs
+
+def _import_lazy_modules():
+    """Import the modules of all the stubs, and register their real
+    commands.  This is connected to the before_prompt event until GDB
+    first displays its prompt, when no command is being executed."""
+    global _lazy_prompt_handler
+    events.before_prompt.disconnect(_lazy_prompt_handler)
+    _lazy_prompt_handler = None
+    # The stubs of each module are in the order of its manifest, where
+    # prefix commands come before their subcommands.
+    for stubs in list(_lazy_stubs.values()):
+        for stub in stubs:
+            try:
+                stub.load()
+            except:
+                sys.stderr.write (traceback.format_exc() + "\n")
+    _lazy_stubs.clear()
+    _unregistered_modules.clear()
+
 # pkgutil.iter_modules is not available prior to Python 2.6.  Instead,
 # manually iterate the list, collating the Python files in each module
 # path.  Construct the module name, and import.
 
 def _auto_load_packages():
+    global _lazy_prompt_handler
     for package in packages:
         location = os.path.join(os.path.dirname(__file__), package)
         if os.path.exists(location):
@@ -158,11 +328,27 @@ def _auto_load_packages():
                                         and x != '__init__.py',
                               os.listdir(location))
 
+            pkgname = "%s.%s" % (__name__, package)
+            try:
+                __import__(pkgname)
+                lazy_modules = getattr(sys.modules[pkgname],
+                                       '_lazy_modules', {})
+            except:
+                sys.stderr.write (traceback.format_exc() + "\n")
+                lazy_modules = {}
+
             for py_file in py_files:
                 # Construct from foo.py, gdb.module.foo
                 modname = "%s.%s.%s" % ( __name__, package, py_file[:-3] )
                 try:
-                    if modname in sys.modules:
+                    if modname in _lazy_stubs:
+                        # Its stubs are already registered.
+                        pass
+                    elif (modname not in sys.modules
+                          and py_file[:-3] in lazy_modules):
+                        _register_lazy_module(package, modname,
+                                              lazy_modules[py_file[:-3]])
+                    elif modname in sys.modules:
                         # reload modules with duplicate names
                         reload(__import__(modname))
                     else:
@@ -170,6 +356,10 @@ def _auto_load_packages():
                 except:
                     sys.stderr.write (traceback.format_exc() + "\n")
 
+    if _lazy_stubs and _lazy_prompt_handler is None:
+        _lazy_prompt_handler = _import_lazy_modules
+        events.before_prompt.connect(_lazy_prompt_handler)
+
 _auto_load_packages()
 
 def GdbSetPythonDirectory(dir):
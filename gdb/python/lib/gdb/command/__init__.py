@@ -13,4 +13,44 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import gdb
 
+# The modules of this package which are only imported when one of
+# their commands is first used, or when GDB first displays its prompt,
+# with the commands they define: the name, the command class, whether it
+# is a prefix command, the name of the class in the module and the first
+# line of the documentation of each command.  Prefix commands come
+# before their subcommands.  When a stub imports one of these modules,
+# gdb._lazy_importing is the name of the module, which must not register
+# its commands then.  Modules defining parameters or command completers
+# are imported when GDB starts and are not listed here.
+
+_lazy_modules = {
+    'explore': (
+        ('explore', gdb.COMMAND_DATA, True, 'ExploreCommand',
+         'Explore a value or a type valid in the current context.'),
+        ('explore value', gdb.COMMAND_DATA, False, 'ExploreValueCommand',
+         'Explore value of an expression valid in the current context.'),
+        ('explore type', gdb.COMMAND_DATA, False, 'ExploreTypeCommand',
+         'Explore a type or the type of an expression.'),
+    ),
+    'pretty_printers': (
+        ('info pretty-printer', gdb.COMMAND_DATA, False,
+         'InfoPrettyPrinter',
+         'GDB command to list all registered pretty-printers.'),
+        ('enable pretty-printer', gdb.COMMAND_DATA, False,
+         'EnablePrettyPrinter',
+         'GDB command to enable the specified pretty-printer.'),
+        ('disable pretty-printer', gdb.COMMAND_DATA, False,
+         'DisablePrettyPrinter',
+         'GDB command to disable the specified pretty-printer.'),
+    ),
+    'unwinders': (
+        ('info unwinder', gdb.COMMAND_STACK, False, 'InfoUnwinder',
+         'GDB command to list unwinders.'),
+        ('enable unwinder', gdb.COMMAND_STACK, False, 'EnableUnwinder',
+         'GDB command to enable unwinders.'),
+        ('disable unwinder', gdb.COMMAND_STACK, False, 'DisableUnwinder',
+         'GDB command to disable the specified unwinder.'),
+    ),
+}
@@ -17,6 +17,8 @@
 """Implementation of the GDB 'explore' command using the GDB Python API."""
 
 import gdb
+import gdb.types
+import re
 import sys
 
 if sys.version_info[0] > 2:
@@ -114,6 +116,26 @@ class Explorer(object):
             print ("Explorer for type '%s' not yet available.\n" %
                    str(datatype))
 
+    @staticmethod
+    def children(expr, value):
+        """Main function to list the children of an expression value,
+        without prompting the user.  It is used by the non-interactive
+        exploration functions in the gdb.explore module.
+
+        Arguments:
+            expr: The expression string of the value.
+            value: The gdb.Value value of the expression.
+
+        Returns:
+            An iterable of (expression string, gdb.Value) pairs, one for
+            each child of the value.
+        """
+        type_code = value.type.code
+        if type_code in Explorer.type_code_to_explorer_map:
+            explorer_class = Explorer.type_code_to_explorer_map[type_code]
+            return explorer_class.children(expr, value)
+        return ()
+
     @staticmethod
     def init_env():
         """Initializes the Explorer environment.
@@ -206,6 +228,13 @@ class ScalarExplorer(object):
 
         return False
 
+    @staticmethod
+    def children(expr, value):
+        """Scalar values have no children.
+        See Explorer.children for more information.
+        """
+        return ()
+
     @staticmethod
     def explore_type(name, datatype, is_child):
         """Function to explore scalar types.
@@ -264,9 +293,23 @@ class PointerExplorer(object):
         if option == "y":
             while True:
                 index = 0
+                # A range LOW:HIGH may be entered instead of an index.
+                choice = raw_input("Enter the index of the element you "
+                                   "want to explore in '%s': " % expr)
                 try:
-                    index = int(raw_input("Enter the index of the element you "
-                                          "want to explore in '%s': " % expr))
+                    bounds = ExploreUtils.parse_bounds(choice)
+                except gdb.GdbError as e:
+                    print (str(e))
+                    continue
+                if bounds is not None:
+                    try:
+                        ArrayExplorer.explore_range(expr, value, bounds[0],
+                                                    bounds[1])
+                    except gdb.GdbError as e:
+                        print (str(e))
+                    continue
+                try:
+                    index = int(choice)
                 except ValueError:
                     break
                 element_expr = "%s[%d]" % (Explorer.guard_expr(expr), index)
@@ -283,6 +326,16 @@ class PointerExplorer(object):
             Explorer.return_to_parent_value()
         return False
 
+    @staticmethod
+    def children(expr, value):
+        """The child of a non-null pointer is the value it points to.
+        See Explorer.children for more information.
+        """
+        target_code = value.type.target().strip_typedefs().code
+        if target_code == gdb.TYPE_CODE_VOID or int(value) == 0:
+            return ()
+        return (("*%s" % Explorer.guard_expr(expr), value.dereference()),)
+
     @staticmethod
     def explore_type(name, datatype, is_child):
         """Function to explore pointer types.
@@ -310,6 +363,13 @@ class ReferenceExplorer(object):
         Explorer.explore_expr(expr, referenced_value, is_child)
         return False
 
+    @staticmethod
+    def children(expr, value):
+        """Function to list the children of the referenced value.
+        See Explorer.children for more information.
+        """
+        return Explorer.children(expr, value.referenced_value())
+
     @staticmethod
     def explore_type(name, datatype, is_child):
         """Function to explore pointer types.
@@ -322,6 +382,114 @@ class ReferenceExplorer(object):
 class ArrayExplorer(object):
     """Internal class used to explore arrays."""
 
+    # The number of elements shown at once when exploring a range.
+    RANGE_PAGE_SIZE = 20
+
+    @staticmethod
+    def explore_range(expr, value, low, high):
+        """Function to explore the elements LOW to HIGH - 1 of an array, or
+        of the array a pointer points to.  The elements are read from
+        memory with a single read, and shown a page at a time, along with
+        their minimum, maximum and number of distinct values when they are
+        scalars.
+
+        Arguments:
+            expr: The expression string of the array or pointer.
+            value: The gdb.Value of the array or pointer.
+            low: The index of the first element of the range, or None for
+                 the first element of the array.
+            high: The index following the last element of the range, or
+                  None for the end of the array.
+
+        Returns:
+            No return value.
+
+        Raises:
+            gdb.GdbError if the range is invalid or cannot be read.
+        """
+        datatype = value.type.strip_typedefs()
+        if (datatype.code == gdb.TYPE_CODE_REF
+            or datatype.code == gdb.TYPE_CODE_RVALUE_REF):
+            value = value.referenced_value()
+            datatype = value.type.strip_typedefs()
+        if datatype.code == gdb.TYPE_CODE_ARRAY:
+            bounds = datatype.range()
+            if low is None:
+                low = bounds[0]
+            if high is None:
+                high = bounds[1] + 1
+            if low < bounds[0] or high > bounds[1] + 1:
+                raise gdb.GdbError("Range %d:%d is out of the bounds of "
+                                   "'%s'." % (low, high, expr))
+            if value.address is None:
+                raise gdb.GdbError("'%s' is not in memory." % expr)
+            address = int(value.address) - bounds[0] * datatype.target().sizeof
+        elif datatype.code == gdb.TYPE_CODE_PTR:
+            if low is None:
+                low = 0
+            if high is None:
+                raise gdb.GdbError("The end of a range of '%s' is needed, "
+                                   "since it is a pointer." % expr)
+            address = int(value)
+        else:
+            raise gdb.GdbError("'%s' is not an array or a pointer." % expr)
+
+        target_type = datatype.target()
+        count = high - low
+        if count <= 0:
+            raise gdb.GdbError("Range %d:%d is empty." % (low, high))
+        size = target_type.sizeof
+        try:
+            data = gdb.selected_inferior().read_memory(address + low * size,
+                                                       count * size)
+        except gdb.MemoryError as e:
+            raise gdb.GdbError("Cannot read '%s[%d:%d]': %s" %
+                               (expr, low, high, str(e)))
+        data = bytes(data)
+        # The elements are shown from a copy of the range, so that paging
+        # does not read memory again.
+        elements = gdb.Value(data, target_type.array(count - 1))
+
+        range_expr = "%s[%d:%d]" % (Explorer.guard_expr(expr), low, high)
+        print ("'%s' is a range of %d elements of type '%s'." %
+               (range_expr, count, str(target_type)))
+        if Explorer.is_scalar_type(target_type.strip_typedefs()):
+            scalars = gdb.types._decode_scalars(target_type, data)
+            if scalars:
+                print ("Minimum value: %s" % min(scalars))
+                print ("Maximum value: %s" % max(scalars))
+                print ("Distinct values: %d" % len(set(scalars)))
+
+        page_size = ArrayExplorer.RANGE_PAGE_SIZE
+        first = low
+        while True:
+            last = min(first + page_size, high)
+            print ("")
+            for index in range(first, last):
+                print ("  %s[%d] = %s" % (Explorer.guard_expr(expr), index,
+                                          str(elements[index - low])))
+            print ("")
+            choice = raw_input("Enter 'n' for the next page, 'p' for the "
+                               "previous page, or the index of the element "
+                               "you want to explore: ")
+            if choice == "n":
+                if last < high:
+                    first = last
+                continue
+            if choice == "p":
+                first = max(first - page_size, low)
+                continue
+            try:
+                index = int(choice)
+            except ValueError:
+                return
+            if index < low or index >= high:
+                print ("Index %d is not in the range." % index)
+                continue
+            Explorer.explore_expr("%s[%d]" % (Explorer.guard_expr(expr),
+                                              index),
+                                  value[index], True)
+
     @staticmethod
     def explore_expr(expr, value, is_child):
         """Function to explore array values.
@@ -351,6 +519,16 @@ class ArrayExplorer(object):
                               element, True)
         return True
 
+    @staticmethod
+    def children(expr, value):
+        """The children of an array are its elements.
+        See Explorer.children for more information.
+        """
+        low, high = value.type.range()
+        guarded_expr = Explorer.guard_expr(expr)
+        for index in range(low, high + 1):
+            yield ("%s[%d]" % (guarded_expr, index), value[index])
+
     @staticmethod
     def explore_type(name, datatype, is_child):
         """Function to explore array types.
@@ -364,9 +542,83 @@ class ArrayExplorer(object):
         return False
 
 
+class _CompoundDescription(object):
+    """Internal class holding what CompoundExplorer needs to know about a
+    struct/class or union type.  It is computed once per type by
+    CompoundExplorer.describe, since computing it for classes with
+    hundreds of members takes time, and exploring them goes back and
+    forth between the same types.
+    """
+
+    def __init__(self, datatype):
+        self.type_str = str(datatype)
+        if datatype.code == gdb.TYPE_CODE_STRUCT:
+            self.type_desc = "struct/class"
+        else:
+            self.type_desc = "union"
+        # The fields which are not artificial, with the string of their
+        # type, whether it is a scalar type and their description.
+        self.fields = tuple(field for field in datatype.fields()
+                            if not field.artificial)
+        self.field_type_strs = tuple(str(field.type)
+                                     for field in self.fields)
+        self.field_is_scalar = tuple(Explorer.is_scalar_type(field.type)
+                                     for field in self.fields)
+        self.field_descs = tuple(
+            "base class" if field.is_base_class else "field"
+            for field in self.fields)
+        self._flattened_fields = None
+
+    @property
+    def flattened_fields(self):
+        """The data members of the type, including those inherited from
+        its base classes, which come first.  The description of each base
+        class is itself cached.
+        """
+        if self._flattened_fields is None:
+            flattened_fields = [ ]
+            for field in self.fields:
+                if field.is_base_class:
+                    base = CompoundExplorer.describe(field.type)
+                    flattened_fields.extend(base.flattened_fields)
+                else:
+                    flattened_fields.append(field)
+            self._flattened_fields = tuple(flattened_fields)
+        return self._flattened_fields
+
+
 class CompoundExplorer(object):
     """Internal class used to explore struct, classes and unions."""
 
+    # The _CompoundDescription of each type explored so far, keyed by
+    # gdb.types._type_key.
+    _descriptions = { }
+
+    @staticmethod
+    def describe(datatype):
+        """Return the cached description of a struct/class or union type.
+
+        Arguments:
+            datatype: The gdb.Type value of the type.
+
+        Returns:
+            The _CompoundDescription of the type.
+        """
+        datatype = datatype.strip_typedefs()
+        key = gdb.types._type_key(datatype)
+        description = CompoundExplorer._descriptions.get(key)
+        if description is None:
+            description = _CompoundDescription(datatype)
+            if key is not None:
+                CompoundExplorer._descriptions[key] = description
+        return description
+
+    @staticmethod
+    def clear_descriptions(*args):
+        """Forget the cached descriptions of types, whose objfiles may have
+        changed."""
+        CompoundExplorer._descriptions.clear()
+
     @staticmethod
     def _print_fields(print_list):
         """Internal function which prints the fields of a struct/class/union.
@@ -379,47 +631,33 @@ class CompoundExplorer(object):
         for pair in print_list:
             print ("  %*s = %s" % (max_field_name_length, pair[0], pair[1]))
 
-    @staticmethod
-    def _get_real_field_count(fields):
-        real_field_count = 0;
-        for field in fields:
-            if not field.artificial:
-                real_field_count = real_field_count + 1
-
-        return real_field_count
-
     @staticmethod
     def explore_expr(expr, value, is_child):
         """Function to explore structs/classes and union values.
         See Explorer.explore_expr for more information.
         """
-        datatype = value.type
-        type_code = datatype.code
-        fields = datatype.fields()
-
-        if type_code == gdb.TYPE_CODE_STRUCT:
-            type_desc = "struct/class"
-        else:
-            type_desc = "union"
+        type_code = value.type.code
+        description = CompoundExplorer.describe(value.type)
+        type_desc = description.type_desc
 
-        if CompoundExplorer._get_real_field_count(fields) == 0:
+        if not description.fields:
             print ("The value of '%s' is a %s of type '%s' with no fields." %
-                   (expr, type_desc, str(value.type)))
+                   (expr, type_desc, description.type_str))
             if is_child:
                 Explorer.return_to_parent_value_prompt()
             return False
 
         print ("The value of '%s' is a %s of type '%s' with the following "
-              "fields:\n" % (expr, type_desc, str(value.type)))
+              "fields:\n" % (expr, type_desc, description.type_str))
 
         has_explorable_fields = False
         choice_to_compound_field_map = { }
         current_choice = 0
         print_list = [ ]
-        for field in fields:
-            if field.artificial:
-                continue
-            field_full_name = Explorer.guard_expr(expr) + "." + field.name
+        guarded_expr = Explorer.guard_expr(expr)
+        for i, field in enumerate(description.fields):
+            field_type_str = description.field_type_strs[i]
+            field_full_name = guarded_expr + "." + field.name
             if field.is_base_class:
                 field_value = value.cast(field.type)
             else:
@@ -427,21 +665,18 @@ class CompoundExplorer(object):
             literal_value = ""
             if type_code == gdb.TYPE_CODE_UNION:
                 literal_value = ("<Enter %d to explore this field of type "
-                                 "'%s'>" % (current_choice, str(field.type)))
+                                 "'%s'>" % (current_choice, field_type_str))
                 has_explorable_fields = True
             else:
-                if Explorer.is_scalar_type(field.type):
+                if description.field_is_scalar[i]:
                     literal_value = ("%s .. (Value of type '%s')" %
-                                     (str(field_value), str(field.type)))
+                                     (str(field_value), field_type_str))
                 else:
-                    if field.is_base_class:
-                        field_desc = "base class"
-                    else:
-                        field_desc = "field"
                     literal_value = ("<Enter %d to explore this %s of type "
                                      "'%s'>" %
-                                     (current_choice, field_desc,
-                                      str(field.type)))
+                                     (current_choice,
+                                      description.field_descs[i],
+                                      field_type_str))
                     has_explorable_fields = True
 
             choice_to_compound_field_map[str(current_choice)] = (
@@ -474,15 +709,10 @@ class CompoundExplorer(object):
         """Function to explore struct/class and union types.
         See Explorer.explore_type for more information.
         """
-        type_code = datatype.code
-        type_desc = ""
-        if type_code == gdb.TYPE_CODE_STRUCT:
-            type_desc = "struct/class"
-        else:
-            type_desc = "union"
+        description = CompoundExplorer.describe(datatype)
+        type_desc = description.type_desc
 
-        fields = datatype.fields()
-        if CompoundExplorer._get_real_field_count(fields) == 0:
+        if not description.fields:
             if is_child:
                 print ("%s is a %s of type '%s' with no fields." %
                        (name, type_desc, str(datatype)))
@@ -500,19 +730,14 @@ class CompoundExplorer(object):
                    "fields:\n" %
                    (name, type_desc))
 
-        has_explorable_fields = False
         current_choice = 0
         choice_to_compound_field_map = { }
         print_list = [ ]
-        for field in fields:
-            if field.artificial:
-                continue
-            if field.is_base_class:
-                field_desc = "base class"
-            else:
-                field_desc = "field"
+        for i, field in enumerate(description.fields):
+            field_desc = description.field_descs[i]
             rhs = ("<Enter %d to explore this %s of type '%s'>" %
-                   (current_choice, field_desc, str(field.type)))
+                   (current_choice, field_desc,
+                    description.field_type_strs[i]))
             print_list.append((field.name, rhs))
             choice_to_compound_field_map[str(current_choice)] = (
                 field.name, field.type, field_desc)
@@ -545,6 +770,26 @@ class CompoundExplorer(object):
                 Explorer.return_to_enclosing_type_prompt()
 
         return False
+
+    @staticmethod
+    def children(expr, value):
+        """The children of a struct/class or union value are its fields and
+        base classes.
+        See Explorer.children for more information.
+        """
+        guarded_expr = Explorer.guard_expr(expr)
+        for field in CompoundExplorer.describe(value.type).fields:
+            if field.is_base_class:
+                field_value = value.cast(field.type)
+            elif field.name is None:
+                # The members of an anonymous struct or union are
+                # accessed as if they were members of this value.
+                for child in Explorer.children(expr, value[field]):
+                    yield child
+                continue
+            else:
+                field_value = value[field.name]
+            yield (guarded_expr + "." + field.name, field_value)
            
 
 class TypedefExplorer(object):
@@ -563,6 +808,14 @@ class TypedefExplorer(object):
         Explorer.explore_expr(expr, value.cast(actual_type), is_child)
         return False
 
+    @staticmethod
+    def children(expr, value):
+        """Function to list the children of typedef values.
+        See Explorer.children for more information.
+        """
+        actual_type = value.type.strip_typedefs()
+        return Explorer.children(expr, value.cast(actual_type))
+
     @staticmethod
     def explore_type(name, datatype, is_child):
         """Function to explore typedef types.
@@ -628,6 +881,64 @@ class ExploreUtils(object):
             except RuntimeError:
                 return None
 
+    # A range of array elements, as in 'arr[1000:2000]'.
+    _RANGE_RE = re.compile(r"^(.+)\[([^][:]*):([^][:]*)\]\s*$")
+
+    @staticmethod
+    def parse_bounds(bounds_str):
+        """A utility function to parse the bounds LOW:HIGH of a range of
+        array elements.  Each bound is an expression, and may be empty.
+
+        Arguments:
+            bounds_str: The string to parse.
+
+        Returns:
+            A (low, high) tuple of integers, where a missing bound is
+            None, or None if bounds_str is not a range.
+
+        Raises:
+            gdb.GdbError if a bound is not a valid expression.
+        """
+        if bounds_str.count(":") != 1:
+            return None
+        bounds = [ ]
+        for bound_str in bounds_str.split(":"):
+            bound_str = bound_str.strip()
+            if bound_str == "":
+                bounds.append(None)
+                continue
+            try:
+                bounds.append(int(gdb.parse_and_eval(bound_str)))
+            except RuntimeError:
+                raise gdb.GdbError("'%s' is not a valid bound." % bound_str)
+        return tuple(bounds)
+
+    @staticmethod
+    def get_range_from_str(arg_str):
+        """A utility function to recognize a range of array elements, as in
+        'arr[1000:2000]'.  This is only meant for arguments which are not
+        valid expressions, since valid ones like 'arr[b ? 1 : 2]' may
+        look like ranges too.
+
+        Arguments:
+            arg_str: The argument string passed to an explore command.
+
+        Returns:
+            A tuple (expr, value, low, high), where expr is the expression
+            of the array or pointer, value its gdb.Value, and low and high
+            the bounds as returned by parse_bounds, or None if arg_str is
+            not a range.
+        """
+        match = ExploreUtils._RANGE_RE.match(arg_str)
+        if match is None:
+            return None
+        value = ExploreUtils.get_value_from_str(match.group(1))
+        if value is None:
+            return None
+        low, high = ExploreUtils.parse_bounds("%s:%s" % (match.group(2),
+                                                         match.group(3)))
+        return (match.group(1), value, low, high)
+
     @staticmethod
     def get_value_from_str(value_str):
         """A utility function to deduce the gdb.Value value from a string
@@ -670,6 +981,12 @@ choice, if any) to return to the enclosing type or value."""
             Explorer.explore_expr(arg_str, value, False)
             return
 
+        # Check if it is a range of array elements
+        array_range = ExploreUtils.get_range_from_str(arg_str)
+        if array_range is not None:
+            ArrayExplorer.explore_range(*array_range)
+            return
+
         # If it is not a value, check if it is a type
         datatype = ExploreUtils.get_type_from_str(arg_str)
         if datatype is not None:
@@ -688,7 +1005,9 @@ class ExploreValueCommand(gdb.Command):
 
 Usage: explore value ARG
 
-- ARG is a valid expression.
+- ARG is a valid expression, or a range of elements ARRAY[LOW:HIGH] of
+an array or of the array a pointer points to, which is shown a page at a
+time.
 - At any stage of exploration, hit the return key (instead of a
 choice, if any) to return to the enclosing value."""
  
@@ -702,6 +1021,10 @@ choice, if any) to return to the enclosing value."""
 
         value = ExploreUtils.get_value_from_str(arg_str)
         if value is None:
+            array_range = ExploreUtils.get_range_from_str(arg_str)
+            if array_range is not None:
+                ArrayExplorer.explore_range(*array_range)
+                return
             raise gdb.GdbError(
                 (" '%s' does not evaluate to a value in the current "
                  "context." %
@@ -745,6 +1068,12 @@ choice, if any) to return to the enclosing type."""
 
 Explorer.init_env()
 
-ExploreCommand()
-ExploreValueCommand()
-ExploreTypeCommand()
+gdb.events.new_objfile.connect(CompoundExplorer.clear_descriptions)
+gdb.events.clear_objfiles.connect(CompoundExplorer.clear_descriptions)
+
+# The stubs of gdb.command._lazy_modules register these commands when
+# they import this module.
+if gdb._lazy_importing != __name__:
+    ExploreCommand()
+    ExploreValueCommand()
+    ExploreTypeCommand()
@@ -362,4 +362,7 @@ def register_pretty_printer_commands():
     EnablePrettyPrinter()
     DisablePrettyPrinter()
 
-register_pretty_printer_commands()
+# The stubs of gdb.command._lazy_modules register these commands when
+# they import this module.
+if gdb._lazy_importing != __name__:
+    register_pretty_printer_commands()
@@ -18,6 +18,46 @@
 
 import gdb
 import gdb.prompt
+import timeit
+
+class _ExtendedPromptTimeBudget(gdb.Parameter):
+
+    """Set the time budget of extended prompt substitutions.
+
+Usage: set extended-prompt-time-budget MILLISECONDS|unlimited
+
+When a substitution of the extended prompt takes longer than this to
+compute, it is not computed when the prompt is next displayed.
+Instead, its last value, or "..." if there is none, is displayed, and
+it is computed again once the prompt has been displayed, for the
+following prompt.  A substitution function may also have its own budget,
+in seconds, in a "time_budget" attribute; it is then first computed
+after the prompt is displayed."""
+
+    set_doc = "Set the time budget of extended prompt substitutions."
+    show_doc = "Show the time budget of extended prompt substitutions."
+
+    def __init__(self):
+        super(_ExtendedPromptTimeBudget, self).__init__(
+            "extended-prompt-time-budget", gdb.COMMAND_SUPPORT,
+            gdb.PARAM_ZUINTEGER_UNLIMITED)
+        self.value = -1
+
+    def get_show_string (self, pvalue):
+        if self.value < 0:
+            return ("The time budget of extended prompt substitutions "
+                    "is unlimited.")
+        return ("The time budget of extended prompt substitutions is "
+                "%s milliseconds." % pvalue)
+
+    def get_set_string (self):
+        return ""
+
+_time_budget = _ExtendedPromptTimeBudget()
+
+# What is displayed in place of a slow substitution which has never
+# been computed.
+_PLACEHOLDER = '...'
 
 class _ExtendedPrompt(gdb.Parameter):
 
@@ -43,6 +83,23 @@ The currently defined substitutions are:
                                               gdb.PARAM_STRING_NOESCAPE)
         self.value = ''
         self.hook_set = False
+        # The value the prompt was compiled from.
+        self.compiled_value = ''
+        self.compiled = []
+        # The cached values of the substitutions of the compiled
+        # prompt, indexed by position, the positions whose values can
+        # be cached, and the positions to forget when an event of each
+        # gdb.events registry is emitted.
+        self.cache = {}
+        self.cacheable = set()
+        self.dependents = {}
+        self.connected = set()
+        # The last values of the substitutions, whether still valid or
+        # not, the positions of the substitutions which exceeded their
+        # time budget, and whether they are due to be recomputed.
+        self.last = {}
+        self.slow = set()
+        self.refresh_pending = False
 
     def get_show_string (self, pvalue):
         if self.value:
@@ -54,11 +111,106 @@ The currently defined substitutions are:
         if self.hook_set == False:
            gdb.prompt_hook = self.before_prompt_hook
            self.hook_set = True
+        self.compile()
         return ""
 
+    def compile(self):
+        """Parse the prompt once, rather than each time it is displayed,
+        and find out which of its substitutions can be cached."""
+        self.compiled_value = self.value
+        self.compiled = gdb.prompt.compile_prompt(self.value)
+        self.cache = {}
+        self.cacheable = set()
+        self.dependents = {}
+        self.last = {}
+        self.slow = set()
+        for i, item in enumerate(self.compiled):
+            if type(item) is tuple:
+                # Substitutions with their own time budget may be slow,
+                # so they are first computed after the prompt is
+                # displayed.
+                func = gdb.prompt.prompt_substitutions.get(item[0])
+                if getattr(func, 'time_budget', None) is not None:
+                    self.slow.add(i)
+                events = gdb.prompt._substitution_events(item[0])
+                if events is None:
+                    continue
+                if not all(self.connect(name) for name in events):
+                    continue
+                for name in events:
+                    self.dependents.setdefault(name, []).append(i)
+                self.cacheable.add(i)
+
+    def connect(self, name):
+        """Forget the cached values depending on the events of the
+        gdb.events registry NAME when they are emitted.  Return False
+        if there is no such registry."""
+        if name not in self.connected:
+            registry = getattr(gdb.events, name, None)
+            if registry is None:
+                return False
+            registry.connect(lambda *args: self.invalidate(name))
+            self.connected.add(name)
+        return True
+
+    def invalidate(self, name):
+        for i in self.dependents.get(name, ()):
+            self.cache.pop(i, None)
+
+    def time_budget(self, cmdch):
+        """Return the time budget of the substitution CMDCH in seconds,
+        or None if it is unlimited."""
+        func = gdb.prompt.prompt_substitutions.get(cmdch)
+        budget = getattr(func, 'time_budget', None)
+        if budget is None and _time_budget.value >= 0:
+            budget = _time_budget.value / 1000.0
+        return budget
+
+    def evaluate(self, i):
+        """Compute the substitution at position I, and note whether it
+        exceeded its time budget."""
+        cmdch, arg = self.compiled[i]
+        start = timeit.default_timer()
+        value = gdb.prompt._expand_substitution(cmdch, arg)
+        elapsed = timeit.default_timer() - start
+        budget = self.time_budget(cmdch)
+        if budget is not None and elapsed > budget:
+            self.slow.add(i)
+        else:
+            self.slow.discard(i)
+        self.last[i] = value
+        if i in self.cacheable:
+            self.cache[i] = value
+        return value
+
+    def refresh(self):
+        """Recompute the slow substitutions which are out of date.
+        This is posted with gdb.post_event, so that it runs after the
+        prompt has been displayed."""
+        self.refresh_pending = False
+        for i in sorted(self.slow):
+            if i < len(self.compiled) and i not in self.cache:
+                self.evaluate(i)
+
     def before_prompt_hook(self, current):
+        # The value may also be assigned without a "set" command.
+        if self.value != self.compiled_value:
+            self.compile()
         if self.value:
-            return gdb.prompt.substitute_prompt(self.value)
+            result = []
+            for i, item in enumerate(self.compiled):
+                if type(item) is tuple:
+                    if i in self.cache:
+                        item = self.cache[i]
+                    elif i in self.slow:
+                        item = self.last.get(i, _PLACEHOLDER)
+                        if not self.refresh_pending:
+                            self.refresh_pending = True
+                            gdb.post_event(self.refresh)
+                    else:
+                        item = self.evaluate(i)
+                result.append(item)
+            return ''.join(result)
         else:
             return None
 
@@ -16,6 +16,7 @@
 
 import copy
 import gdb
+import gdb.types
 
 """GDB commands for working with type-printers."""
 
@@ -83,6 +84,7 @@ class _EnableOrDisableCommand(gdb.Command):
                 ok = True
             if not ok:
                 print ("No type printer named '%s'" % name)
+        gdb.types._invalidate_type_recognizers()
 
     def add_some(self, result, word, printers):
         for p in printers:
@@ -192,4 +192,7 @@ def register_unwinder_commands():
     DisableUnwinder()
 
 
-register_unwinder_commands()
+# The stubs of gdb.command._lazy_modules register these commands when
+# they import this module.
+if gdb._lazy_importing != __name__:
+    register_unwinder_commands()
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import gdb
+import gdb.xmethod
 import re
 
 """GDB commands for working with xmethods."""
@@ -78,7 +79,8 @@ def get_global_method_matchers(locus_re, matcher_re):
     xm_dict = { locus_str: [] }
     if locus_re.match("global"):
         xm_dict[locus_str].extend(
-            [m for m in gdb.xmethods if matcher_re.match(m.name)])
+            gdb.xmethod._get_xmethod_matcher_registry(gdb).find_matching(
+                matcher_re))
     return xm_dict
 
 
@@ -110,8 +112,9 @@ def get_method_matchers_in_loci(loci, locus_re, matcher_re):
                 continue
             locus_type = "objfile"
         locus_str = "%s %s" % (locus_type, locus.filename)
-        xm_dict[locus_str] = [
-            m for m in locus.xmethods if matcher_re.match(m.name)]
+        xm_dict[locus_str] = (
+            gdb.xmethod._get_xmethod_matcher_registry(locus).find_matching(
+                matcher_re))
     return xm_dict
 
 
@@ -172,6 +175,9 @@ def set_xm_status(arg, status):
         get_method_matchers_in_loci(gdb.objfiles(), locus_re, matcher_re),
         name_re,
         status)
+    # Matchers and xmethods which are not derived from the classes in
+    # gdb.xmethod do not invalidate the match results themselves.
+    gdb.xmethod._invalidate_match_results()
 
 
 class InfoXMethod(gdb.Command):
@@ -261,11 +267,81 @@ can be specified as matcher-name-regexp;xmethod-name-regexp."""
         set_xm_status(arg, False)
 
 
+class InfoXMethodStats(gdb.Command):
+    """GDB command to show the statistics of xmethod workers.
+
+Usage: info xmethod-stats [NAME-REGEXP]
+
+Show how many times GDB invoked the get_arg_types, get_result_type and
+__call__ methods of xmethod workers, and the time spent in them.  The
+statistics are aggregated per xmethod matcher and method name, and are
+only collected while 'set xmethod-stats' is on.
+
+NAME-REGEXP is a regular expression matching the names of the xmethod
+matchers whose statistics are shown.  If it is omitted, the statistics
+of all the matchers are shown."""
+
+    def __init__(self):
+        super(InfoXMethodStats, self).__init__("info xmethod-stats",
+                                               gdb.COMMAND_DATA)
+
+    def invoke(self, arg, from_tty):
+        argv = gdb.string_to_argv(arg)
+        if len(argv) > 1:
+            raise SyntaxError("Too many arguments to command.")
+        matcher_re = validate_xm_regexp("matcher name",
+                                        argv[0] if argv else "")
+        stats = gdb.xmethod.get_worker_stats()
+        keys = sorted(key for key in stats if matcher_re.match(key[0]))
+        if not keys:
+            print ("No xmethod worker statistics.")
+            return
+        for matcher_name, method_name in keys:
+            entry = stats[(matcher_name, method_name)]
+            print ("%s;%s" % (matcher_name, method_name))
+            for operation in ("get_arg_types", "get_result_type",
+                              "__call__"):
+                if operation not in entry.calls:
+                    continue
+                print ("  %-16s %8d calls %12.6f seconds"
+                       % (operation, entry.calls[operation],
+                          entry.seconds[operation]))
+
+
+class XMethodStatsParameter(gdb.Parameter):
+    """Set whether to collect the statistics of xmethod workers.
+
+Usage: set xmethod-stats on|off
+
+When on, GDB records how many times the methods of xmethod workers are
+invoked and the time spent in them.  Use 'info xmethod-stats' to show
+the statistics."""
+
+    set_doc = "Set whether to collect the statistics of xmethod workers."
+    show_doc = "Show whether the statistics of xmethod workers are collected."
+
+    def __init__(self):
+        super(XMethodStatsParameter, self).__init__("xmethod-stats",
+                                                    gdb.COMMAND_DATA,
+                                                    gdb.PARAM_BOOLEAN)
+        self.value = False
+
+    def get_set_string(self):
+        gdb.xmethod._set_collect_worker_stats(self.value)
+        return ""
+
+    def get_show_string(self, svalue):
+        return ("Collection of the statistics of xmethod workers is %s."
+                % svalue)
+
+
 def register_xmethod_commands():
     """Installs the xmethod commands."""
     InfoXMethod()
     EnableXMethod()
     DisableXMethod()
+    InfoXMethodStats()
+    XMethodStatsParameter()
 
 
 register_xmethod_commands()
@@ -0,0 +1,203 @@
+# Non-interactive exploration of values.
+# Copyright (C) 2020 Free Software Foundation, Inc.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Utilities for exploring values without prompting the user.
+
+The 'explore' command walks values one step at a time, asking the user
+which field, element or pointee to look at next.  The functions of this
+module walk the same graph of values breadth-first, within a budget, and
+return the part they visited as a tree."""
+
+import collections
+
+import gdb
+import gdb.types
+from gdb.command.explore import Explorer
+
+class ExploreNode(object):
+    """A value visited by explore_value.
+
+    Attributes:
+        expr: The expression string of the value, derived from the
+              expression of the root like those shown by the 'explore'
+              command.
+        value: The gdb.Value of the expression.
+        depth: The distance of the node from the root, which is at depth
+               zero.
+        children: The list of the ExploreNode children of the node: the
+                  fields of a struct, class or union, the elements of an
+                  array, or the value a pointer points to.
+        truncated: True if the node has children which were not visited
+                   because of the budget of the exploration.
+        error: None, or the message of the error which occurred when
+               reading the value, in which case its children were not
+               visited, or when listing its children, in which case
+               only the children listed before the error were visited.
+        parent: The ExploreNode of which this node is a child, or None for
+                the root.
+        same_as: None, or the node visited earlier for the same object,
+                 that is, at the same address and with the same type, in
+                 which case the children of this node were not visited
+                 again.
+        is_cycle: True if SAME_AS is an ancestor of this node, i.e. the
+                  node closes a cycle in the graph of values.
+    """
+
+    def __init__(self, expr, value, depth, parent=None):
+        self.expr = expr
+        self.value = value
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+        self.truncated = False
+        self.error = None
+        self.same_as = None
+        self.is_cycle = False
+
+    def is_ancestor_of(self, node):
+        """Return True if this node is NODE or one of its ancestors."""
+        while node is not None and node.depth >= self.depth:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+    def walk(self):
+        """Yield this node and all its descendants, in depth-first order."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def format(self):
+        """Return a string showing the tree rooted at this node, one line
+        per node, indented according to its depth."""
+        lines = []
+        for node in self.walk():
+            indent = "  " * (node.depth - self.depth)
+            if node.error is not None:
+                text = "<error: %s>" % node.error
+            elif node.is_cycle:
+                text = "<cycle to %s>" % node.same_as.expr
+            elif node.same_as is not None:
+                text = "<same as %s>" % node.same_as.expr
+            elif Explorer.is_scalar_type(node.value.type.strip_typedefs()):
+                text = str(node.value)
+            else:
+                text = "<%s>" % str(node.value.type)
+            if node.truncated:
+                text += " ..."
+            lines.append("%s%s = %s" % (indent, node.expr, text))
+        return "\n".join(lines)
+
+
+def _has_children(node):
+    """Return True if NODE has at least one child."""
+    for child in Explorer.children(node.expr, node.value):
+        return True
+    return False
+
+
+def _object_key(value):
+    """Return the key identifying the object VALUE designates, made of its
+    address and type, or None if VALUE is not in memory or its type has
+    no gdb.types._type_key."""
+    address = value.address
+    if address is None:
+        return None
+    type_key = gdb.types._type_key(value.type.strip_typedefs())
+    if type_key is None:
+        return None
+    return (int(address), type_key)
+
+
+def explore_value(value, max_depth=None, max_nodes=1000, expr=None,
+                  deduplicate=True):
+    """Explore a value breadth-first without prompting the user.
+
+    Arguments:
+        value: The gdb.Value to explore, or an expression string which
+               is evaluated to get it.
+        max_depth: The maximum depth of the nodes to visit, or None for
+                   no limit.  The root is at depth zero.
+        max_nodes: The maximum number of nodes to visit, including the
+                   root, or None for no limit.
+        expr: The expression string of the root.  By default, it is
+              VALUE if VALUE is a string, and "value" otherwise.
+        deduplicate: If True, objects reached several times, for instance
+                     through different pointers, are only expanded the
+                     first time, and the other nodes for them refer to the
+                     first one with their 'same_as' attribute.  This also
+                     stops the exploration of cycles.
+
+    Returns:
+        The ExploreNode for VALUE.  Nodes which were not expanded because
+        of MAX_DEPTH or MAX_NODES have their 'truncated' attribute set.
+    """
+    if not isinstance(value, gdb.Value):
+        if expr is None:
+            expr = value
+        value = gdb.parse_and_eval(value)
+    elif expr is None:
+        expr = "value"
+
+    root = ExploreNode(expr, value, 0)
+    count = 1
+    # The first node visited for each object, indexed by _object_key.
+    # The walk is breadth-first, so this is the shallowest one.
+    visited = {}
+    if deduplicate:
+        key = _object_key(value)
+        if key is not None:
+            visited[key] = root
+    queue = collections.deque((root,))
+    while queue:
+        node = queue.popleft()
+        # An error only stops the exploration of the node it occurs
+        # for.
+        try:
+            node.value.fetch_lazy()
+        except gdb.error as e:
+            node.error = str(e)
+            continue
+        try:
+            if ((max_depth is not None and node.depth >= max_depth)
+                or (max_nodes is not None and count >= max_nodes)):
+                node.truncated = _has_children(node)
+                continue
+            for child_expr, child_value in Explorer.children(node.expr,
+                                                              node.value):
+                if max_nodes is not None and count >= max_nodes:
+                    node.truncated = True
+                    break
+                child = ExploreNode(child_expr, child_value,
+                                    node.depth + 1, node)
+                node.children.append(child)
+                count += 1
+                if deduplicate:
+                    key = _object_key(child_value)
+                    if key is not None:
+                        first = visited.get(key)
+                        if first is not None:
+                            child.same_as = first
+                            child.is_cycle = first.is_ancestor_of(node)
+                            continue
+                        visited[key] = child
+                queue.append(child)
+        except gdb.error as e:
+            node.error = str(e)
+    return root
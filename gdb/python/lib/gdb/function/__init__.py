@@ -12,3 +12,91 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Support for the convenience functions defined in this package."""
+
+import collections
+import re
+
+# The most recently used compiled regular expressions, indexed by
+# pattern, with the least recently used first.
+_regex_cache = collections.OrderedDict()
+_REGEX_CACHE_SIZE = 128
+
+def _compile_regex(pattern):
+    """Return PATTERN compiled, reusing a recently compiled copy.
+    Convenience functions taking a regular expression are mostly used
+    in breakpoint conditions, which see the same few patterns again and
+    again."""
+    try:
+        regex = _regex_cache.pop(pattern)
+    except KeyError:
+        regex = re.compile(pattern)
+        if len(_regex_cache) >= _REGEX_CACHE_SIZE:
+            _regex_cache.popitem(last=False)
+    _regex_cache[pattern] = regex
+    return regex
+
+# Sets of strings for the set membership convenience functions, indexed
+# by name.
+_string_sets = {}
+
+def define_string_set(name, strings):
+    """Define the set of strings NAME, for use by the set membership
+    convenience functions such as $_in_set, from the iterable STRINGS.
+    A previous set with the same name is replaced."""
+    _string_sets[name] = frozenset(strings)
+
+def load_string_set(name, filename):
+    """Define the set of strings NAME from the lines of the file
+    FILENAME.  Leading and trailing white space is removed from each
+    line, and empty lines and lines starting with '#' are ignored."""
+    strings = []
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                strings.append(line)
+    define_string_set(name, strings)
+
+def _get_string_set(name):
+    """Return the set of strings named by the string value NAME."""
+    name = name.string()
+    try:
+        return _string_sets[name]
+    except KeyError:
+        raise ValueError("No string set named '%s'." % name)
+
+# The modules of this package which are only imported when one of
+# their convenience functions is first called, or when GDB first
+# displays its prompt, with the functions they define: the name and the
+# first line of the documentation of each function.  Each module binds
+# the object of each of its functions to a variable with the name of the
+# function.
+
+_lazy_modules = {
+    'as_string': (
+        ('_as_string', 'Return the string representation of a value.'),
+    ),
+    'caller_is': (
+        ('_caller_is', "Check the calling function's name."),
+        ('_caller_matches',
+         "Compare the calling function's name with a regexp."),
+        ('_any_caller_is', "Check all calling function's names."),
+        ('_any_caller_matches',
+         "Compare all calling function's names with a regexp."),
+        ('_caller_in_set',
+         "Check whether the calling function's name is in a set of strings."),
+        ('_any_caller_in_set',
+         "Check whether any calling function's name is in a set of strings."),
+    ),
+    'sets': (
+        ('_in_set', 'Check whether a string belongs to a set of strings.'),
+    ),
+    'strfns': (
+        ('_memeq', '$_memeq - compare bytes of memory.'),
+        ('_strlen', '$_strlen - compute string length.'),
+        ('_streq', '$_streq - check string equality.'),
+        ('_regex', '$_regex - check if a string matches a regular expression.'),
+    ),
+}
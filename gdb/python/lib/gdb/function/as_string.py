@@ -34,4 +34,4 @@ Returns:
     def invoke(self, val):
         return str(val)
 
-_AsString()
+_as_string = _AsString()
@@ -15,7 +15,35 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import gdb
-import re
+import gdb.function
+
+# The names of the functions of the selected frame and of its callers,
+# as far as the functions below needed them since the frame cache was
+# last flushed.  The chain is shared so that several conditions
+# evaluated at the same stop only unwind the stack once.
+_chain_generation = None
+_chain_frame = None
+_chain_oldest = None
+_chain_names = []
+
+def _caller_names(nframes):
+    """Return the names of the function of the selected frame and of up
+    to NFRAMES of its callers, innermost first.  The list has fewer than
+    NFRAMES + 1 elements if the stack is not that deep."""
+    global _chain_generation, _chain_frame, _chain_oldest
+    generation = gdb.frame_cache_generation()
+    frame = gdb.selected_frame()
+    if _chain_generation != generation or _chain_frame != frame:
+        _chain_generation = generation
+        _chain_frame = frame
+        del _chain_names[:]
+        _chain_oldest = frame
+        _chain_names.append(frame.name())
+    while len(_chain_names) <= nframes and _chain_oldest is not None:
+        _chain_oldest = _chain_oldest.older()
+        if _chain_oldest is not None:
+            _chain_names.append(_chain_oldest.name())
+    return _chain_names[:nframes + 1]
 
 class CallerIs(gdb.Function):
     """Check the calling function's name.
@@ -40,13 +68,11 @@ Returns:
     def invoke(self, name, nframes = 1):
         if nframes < 0:
             raise ValueError("nframes must be >= 0")
-        frame = gdb.selected_frame()
-        while nframes > 0:
-            frame = frame.older()
-            if frame is None:
-                return False
-            nframes = nframes - 1
-        return frame.name() == name.string()
+        nframes = int(nframes)
+        names = _caller_names(nframes)
+        if len(names) <= nframes:
+            return False
+        return names[nframes] == name.string()
 
 class CallerMatches(gdb.Function):
     """Compare the calling function's name with a regexp.
@@ -71,13 +97,12 @@ Returns:
     def invoke(self, name, nframes = 1):
         if nframes < 0:
             raise ValueError("nframes must be >= 0")
-        frame = gdb.selected_frame()
-        while nframes > 0:
-            frame = frame.older()
-            if frame is None:
-                return False
-            nframes = nframes - 1
-        return re.match(name.string(), frame.name()) is not None
+        nframes = int(nframes)
+        names = _caller_names(nframes)
+        if len(names) <= nframes:
+            return False
+        name_re = gdb.function._compile_regex(name.string())
+        return name_re.match(names[nframes]) is not None
 
 class AnyCallerIs(gdb.Function):
     """Check all calling function's names.
@@ -102,15 +127,7 @@ Returns:
     def invoke(self, name, nframes = 1):
         if nframes < 0:
             raise ValueError("nframes must be >= 0")
-        frame = gdb.selected_frame()
-        while nframes >= 0:
-            if frame.name() == name.string():
-                return True 
-            frame = frame.older()
-            if frame is None:
-                return False
-            nframes = nframes - 1
-        return False
+        return name.string() in _caller_names(int(nframes))
 
 class AnyCallerMatches(gdb.Function):
     """Compare all calling function's names with a regexp.
@@ -135,18 +152,77 @@ Returns:
     def invoke(self, name, nframes = 1):
         if nframes < 0:
             raise ValueError("nframes must be >= 0")
-        frame = gdb.selected_frame()
-        name_re = re.compile(name.string())
-        while nframes >= 0:
-            if name_re.match(frame.name()) is not None:
+        name_re = gdb.function._compile_regex(name.string())
+        for frame_name in _caller_names(int(nframes)):
+            if name_re.match(frame_name) is not None:
+                return True
+        return False
+
+
+class CallerInSet(gdb.Function):
+    """Check whether the calling function's name is in a set of strings.
+
+Usage: $_caller_in_set (SET [, NUMBER-OF-FRAMES])
+
+Arguments:
+
+  SET: The name of a set of strings, defined in Python with
+    gdb.function.define_string_set or gdb.function.load_string_set.
+
+  NUMBER-OF-FRAMES: How many stack frames to traverse back from the currently
+    selected frame to compare with.  If the value is greater than the depth of
+    the stack from that point then the result is False.
+    The default is 1.
+
+Returns:
+  True if the function's name at the specified frame is in SET."""
+
+    def __init__(self):
+        super(CallerInSet, self).__init__("_caller_in_set")
+
+    def invoke(self, set_name, nframes = 1):
+        if nframes < 0:
+            raise ValueError("nframes must be >= 0")
+        nframes = int(nframes)
+        strings = gdb.function._get_string_set(set_name)
+        names = _caller_names(nframes)
+        if len(names) <= nframes:
+            return False
+        return names[nframes] in strings
+
+class AnyCallerInSet(gdb.Function):
+    """Check whether any calling function's name is in a set of strings.
+
+Usage: $_any_caller_in_set (SET [, NUMBER-OF-FRAMES])
+
+Arguments:
+
+  SET: The name of a set of strings, defined in Python with
+    gdb.function.define_string_set or gdb.function.load_string_set.
+
+  NUMBER-OF-FRAMES: How many stack frames to traverse back from the currently
+    selected frame to compare with.  If the value is greater than the depth of
+    the stack from that point then the result is False.
+    The default is 1.
+
+Returns:
+  True if any function's name is in SET."""
+
+    def __init__(self):
+        super(AnyCallerInSet, self).__init__("_any_caller_in_set")
+
+    def invoke(self, set_name, nframes = 1):
+        if nframes < 0:
+            raise ValueError("nframes must be >= 0")
+        strings = gdb.function._get_string_set(set_name)
+        for frame_name in _caller_names(int(nframes)):
+            if frame_name in strings:
                 return True
-            frame = frame.older()
-            if frame is None:
-                return False
-            nframes = nframes - 1
         return False
 
-CallerIs()
-CallerMatches()
-AnyCallerIs()
-AnyCallerMatches()
+_caller_is = CallerIs()
+_caller_matches = CallerMatches()
+_any_caller_is = AnyCallerIs()
+_any_caller_matches = AnyCallerMatches()
+_caller_in_set = CallerInSet()
+_any_caller_in_set = AnyCallerInSet()
@@ -0,0 +1,42 @@
+# Set membership functions.
+# Copyright (C) 2020 Free Software Foundation, Inc.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import gdb
+import gdb.function
+
+
+class InSet(gdb.Function):
+    """Check whether a string belongs to a set of strings.
+
+Usage: $_in_set (SET, STRING)
+
+Arguments:
+
+  SET: The name of a set of strings, defined in Python with
+    gdb.function.define_string_set or gdb.function.load_string_set.
+
+  STRING: The string to look for.
+
+Returns:
+  True if STRING is in SET."""
+
+    def __init__(self):
+        super(InSet, self).__init__("_in_set")
+
+    def invoke(self, set_name, string):
+        return string.string() in gdb.function._get_string_set(set_name)
+
+_in_set = InSet()
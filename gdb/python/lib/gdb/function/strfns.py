@@ -17,7 +17,180 @@
 """$_memeq, $_strlen, $_streq, $_regex"""
 
 import gdb
-import re
+import gdb.function
+
+# The size of the first read of a string or block from the inferior's
+# memory.
+# Later reads double in size, up to _MAX_CHUNK, and never cross a
+# multiple of their size, so that no read goes further than needed past
+# the end of a page.
+_FIRST_CHUNK = 64
+_MAX_CHUNK = 4096
+
+def _read_string_chunks(address, limit):
+  """Yield the bytes of the C string at ADDRESS in the inferior's memory,
+  excluding the terminating null, in chunks.  At most LIMIT bytes are
+  read if LIMIT is not None."""
+  read_memory = gdb.selected_inferior().read_memory
+  size = _FIRST_CHUNK
+  while limit is None or limit > 0:
+    count = size - address % size
+    if limit is not None:
+      count = min(count, limit)
+      limit -= count
+    chunk = bytearray(read_memory(address, count))
+    nul = chunk.find(b'\0')
+    if nul >= 0:
+      yield chunk[:nul]
+      return
+    yield chunk
+    address += count
+    size = min(size * 2, _MAX_CHUNK)
+
+def _string_chunks(value, limit):
+  """Return an iterator over chunks of the bytes of the string VALUE,
+  excluding the terminating null and limited to LIMIT bytes if LIMIT is
+  not None, or None if VALUE is not a pointer to or an array of
+  single-byte characters."""
+  type_ = value.type.strip_typedefs()
+  if type_.code != gdb.TYPE_CODE_PTR and type_.code != gdb.TYPE_CODE_ARRAY:
+    return None
+  target = type_.target().strip_typedefs()
+  if (target.code != gdb.TYPE_CODE_INT and target.code != gdb.TYPE_CODE_CHAR
+      or target.sizeof != 1):
+    return None
+  if type_.code == gdb.TYPE_CODE_PTR:
+    return _read_string_chunks(int(value), limit)
+  # Like Value.string, stop at the end of an array.
+  if limit is None or limit > type_.sizeof:
+    limit = type_.sizeof
+  if value.address is not None:
+    return _read_string_chunks(int(value.address), limit)
+  # A string literal, or another array which is not in memory.
+  data = bytearray()
+  for i in range(limit):
+    c = int(value[i]) & 0xff
+    if c == 0:
+      break
+    data.append(c)
+  return iter((data,))
+
+# The ASCII bytes.  In the charsets of single-byte code units, multibyte
+# ones included, a string made of them has one character per byte.
+_ASCII = bytes(bytearray(range(0x80)))
+
+class _NonAsciiString(Exception):
+  """A string has bytes which may be part of multibyte characters."""
+
+def _ascii_chunks(chunks):
+  """Yield the chunks of bytes CHUNKS, in which each byte is a
+  character, and raise _NonAsciiString at the first chunk with other
+  bytes.  Counting the bytes of a string then gives the number of its
+  characters, whatever the target charset."""
+  for chunk in chunks:
+    if chunk.translate(None, _ASCII):
+      raise _NonAsciiString()
+    yield chunk
+
+def _chunks_equal(a_chunks, b_chunks):
+  """Return True if the iterators over chunks of bytes A_CHUNKS and
+  B_CHUNKS produce the same bytes, reading no more than needed."""
+  a_buf = bytearray()
+  b_buf = bytearray()
+  while True:
+    while a_buf is not None and not a_buf:
+      a_buf = next(a_chunks, None)
+    while b_buf is not None and not b_buf:
+      b_buf = next(b_chunks, None)
+    if a_buf is None or b_buf is None:
+      return a_buf is None and b_buf is None
+    n = min(len(a_buf), len(b_buf))
+    if a_buf[:n] != b_buf[:n]:
+      return False
+    a_buf = a_buf[n:]
+    b_buf = b_buf[n:]
+
+def _read_block_chunks(address, length):
+  """Yield the LENGTH bytes at ADDRESS in the inferior's memory, in
+  chunks."""
+  read_memory = gdb.selected_inferior().read_memory
+  size = _FIRST_CHUNK
+  while length > 0:
+    count = min(size, length)
+    yield bytearray(read_memory(address, count))
+    address += count
+    length -= count
+    size = min(size * 2, _MAX_CHUNK)
+
+def _value_bytes(value):
+  """Return the bytes of VALUE, which need not be in memory."""
+  type_ = value.type.strip_typedefs()
+  if type_.code == gdb.TYPE_CODE_ARRAY:
+    # Casting an array would coerce it to a pointer.
+    low, high = type_.range()
+    data = bytearray()
+    for i in range(low, high + 1):
+      data += _value_bytes(value[i])
+    return data
+  if type_.sizeof == 0:
+    return bytearray()
+  byte_vector = gdb.lookup_type("unsigned char").vector(type_.sizeof - 1)
+  value = value.cast(byte_vector)
+  return bytearray(int(value[i]) & 0xff for i in range(type_.sizeof))
+
+def _block_chunks(value, length):
+  """Return an iterator over chunks of the LENGTH bytes VALUE
+  designates, either as a pointer or as an array, and the address of
+  these bytes, or None for an array which is not in memory, such as a
+  string literal."""
+  if value.type.strip_typedefs().code != gdb.TYPE_CODE_ARRAY:
+    address = int(value)
+  elif value.address is not None:
+    address = int(value.address)
+  else:
+    data = _value_bytes(value)
+    if length > len(data):
+      raise ValueError("length is larger than the array")
+    return iter((data[:length],)), None
+  return _read_block_chunks(address, length), address
+
+def _length_limit(length):
+  """Convert the optional length argument of a string function."""
+  if length is None:
+    return None
+  length = int(length)
+  if length < 0:
+    raise ValueError("length must be non-negative")
+  return length
+
+# The largest number of code units a character takes in the charsets
+# GDB supports, reached by UTF-8 and GB18030.
+_MAX_CHAR_UNITS = 4
+
+def _limited_string(value, limit):
+  """Return the string VALUE designates as a Python string, of at most
+  LIMIT characters if LIMIT is not None.
+
+  With a limit, only enough code units for LIMIT characters are read,
+  so that a long or unterminated string is not read whole.  Value.string
+  then reads past the terminating null character, so the result is cut
+  there.  A character cut by the end of the read comes after the first
+  LIMIT ones.  The whole string is read if the limited one cannot be
+  read or holds an invalid character."""
+  if limit is None:
+    return value.string()
+  if limit == 0:
+    # A length of zero would make Value.string read the whole string.
+    return ''
+  try:
+    s = value.string(errors='replace', length=limit * _MAX_CHAR_UNITS)
+  except gdb.error:
+    s = None
+  if s is not None:
+    s = s.split('\0', 1)[0][:limit]
+    if u'\ufffd' not in s:
+      return s
+  return value.string()[:limit]
 
 
 class _MemEq(gdb.Function):
@@ -33,38 +206,56 @@ Returns:
   def invoke(self, a, b, length):
     if length < 0:
       raise ValueError("length must be non-negative")
+    length = int(length)
     if length == 0:
       return True
-    # The argument(s) to vector are [low_bound,]high_bound.
-    byte_vector = gdb.lookup_type("char").vector(length - 1)
-    ptr_byte_vector = byte_vector.pointer()
-    a_ptr = a.reinterpret_cast(ptr_byte_vector)
-    b_ptr = b.reinterpret_cast(ptr_byte_vector)
-    return a_ptr.dereference() == b_ptr.dereference()
+    # Read both blocks in chunks rather than as values of a vector type
+    # of LENGTH bytes, so that a difference near the start of large
+    # blocks is found without reading them whole.
+    a_chunks, a_addr = _block_chunks(a, length)
+    b_chunks, b_addr = _block_chunks(b, length)
+    if a_addr is not None and a_addr == b_addr:
+      return True
+    return _chunks_equal(a_chunks, b_chunks)
 
 
 class _StrLen(gdb.Function):
   """$_strlen - compute string length.
 
-Usage: $_strlen (A)
+Usage: $_strlen (A [, MAXLEN])
 
 Returns:
-  Length of string A, assumed to be a string in the current language."""
+  Length of string A, assumed to be a string in the current language.
+  If MAXLEN is given, at most MAXLEN characters are counted.
+
+Strings of ASCII characters are read from memory in chunks.  Other
+strings are converted to Python strings to count their characters."""
   def __init__(self):
     super(_StrLen, self).__init__("_strlen")
 
-  def invoke(self, a):
-    s = a.string()
-    return len(s)
+  def invoke(self, a, length=None):
+    limit = _length_limit(length)
+    try:
+      chunks = _string_chunks(a, limit)
+      if chunks is not None:
+        return sum(len(chunk) for chunk in _ascii_chunks(chunks))
+    except (gdb.MemoryError, _NonAsciiString):
+      pass
+    return len(_limited_string(a, limit))
 
 
 class _StrEq(gdb.Function):
   """$_streq - check string equality.
 
-Usage: $_streq (A, B)
+Usage: $_streq (A, B [, MAXLEN])
 
 Returns:
   True if A and B are identical strings in the current language.
+  If MAXLEN is given, at most MAXLEN characters are compared.
+
+Strings of single-byte characters are read from memory in chunks, and
+only until they differ.  With MAXLEN, this is only done while they are
+made of ASCII characters.
 
 Example (amd64-linux):
   catch syscall open
@@ -72,8 +263,20 @@ Example (amd64-linux):
   def __init__(self):
     super(_StrEq, self).__init__("_streq")
 
-  def invoke(self, a, b):
-    return a.string() == b.string()
+  def invoke(self, a, b, length=None):
+    limit = _length_limit(length)
+    try:
+      a_chunks = _string_chunks(a, limit)
+      b_chunks = _string_chunks(b, limit)
+      if a_chunks is not None and b_chunks is not None:
+        if limit is not None:
+          # LIMIT counts characters, not bytes.
+          a_chunks = _ascii_chunks(a_chunks)
+          b_chunks = _ascii_chunks(b_chunks)
+        return _chunks_equal(a_chunks, b_chunks)
+    except (gdb.MemoryError, _NonAsciiString):
+      pass
+    return _limited_string(a, limit) == _limited_string(b, limit)
 
 
 class _RegEx(gdb.Function):
@@ -89,12 +292,12 @@ Returns:
 
   def invoke(self, string, regex):
     s = string.string()
-    r = re.compile(regex.string())
+    r = gdb.function._compile_regex(regex.string())
     return bool(r.match(s))
 
 
 # GDB will import us automagically via gdb/__init__.py.
-_MemEq()
-_StrLen()
-_StrEq()
-_RegEx()
+_memeq = _MemEq()
+_strlen = _StrLen()
+_streq = _StrEq()
+_regex = _RegEx()
@@ -12,3 +12,14 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# The modules of this package which are only imported when one of
+# their pretty-printers is first used, or when GDB first displays its
+# prompt, with the builtin pretty-printers they add: the name and the
+# regular expression of each printer.
+
+_lazy_modules = {
+    'bound_registers': (
+        ('mpx_bound128', '^builtin_type_bound128'),
+    ),
+}
@@ -79,6 +79,24 @@ def _prompt_noprint_end(attr):
      "Ends a sequence of non-printing characters."
      return '\002'
 
+# The events after which the value of each substitution may change.  A
+# substitution function may have an 'invalidated_by' attribute, a tuple
+# of the names of the gdb.events registries whose events invalidate its
+# value; "set extended-prompt" caches the value until then.  An empty
+# tuple means that the value never changes, and substitutions without
+# this attribute are evaluated each time the prompt is displayed.
+# Parameters may change without a "set" command, and thus without a
+# param_changed event, so \p is not cached.
+_prompt_frame.invalidated_by = ('stop', 'cont', 'exited',
+                                'selected_context_changed',
+                                'register_changed', 'memory_changed',
+                                'new_objfile', 'clear_objfiles')
+_prompt_thread.invalidated_by = ('stop', 'cont', 'exited', 'new_thread',
+                                 'selected_context_changed')
+for _func in (_prompt_version, _prompt_esc, _prompt_bs, _prompt_n,
+              _prompt_r, _prompt_noprint_begin, _prompt_noprint_end):
+    _func.invalidated_by = ()
+
 prompt_substitutions = {
     'e': _prompt_esc,
     '\\': _prompt_bs,
@@ -107,10 +125,16 @@ An argument can also be passed to it, like "\\f{name}".
 The meaning of the argument depends on the particular substitution."""
     return result
 
-def substitute_prompt(prompt):
-    "Perform substitutions on PROMPT."
+def compile_prompt(prompt):
+    """Parse PROMPT into a list of literal strings and substitutions.
+    Each substitution is a tuple of the substitution character and of
+    its argument, or None.  Adjacent literal characters are joined.
+    The substitution functions themselves are looked up in
+    prompt_substitutions by expand_prompt, so escapes which are not
+    substitutions yet are kept as well."""
 
-    result = ''
+    result = []
+    literal = ''
     plen = len(prompt)
     i = 0
     while i < plen:
@@ -120,29 +144,61 @@ def substitute_prompt(prompt):
                 break
             cmdch = prompt[i]
 
-            if cmdch in prompt_substitutions:
-                cmd = prompt_substitutions[cmdch]
-
-                if i + 1 < plen and prompt[i + 1] == '{':
-                    j = i + 1
-                    while j < plen and prompt[j] != '}':
-                        j = j + 1
-                    # Just ignore formatting errors.
-                    if j >= plen or prompt[j] != '}':
-                        arg = None
-                    else:
-                        arg = prompt[i + 2 : j]
-                        i = j
-                else:
+            if i + 1 < plen and prompt[i + 1] == '{':
+                j = prompt.find('}', i + 1)
+                # Just ignore formatting errors.
+                if j < 0:
                     arg = None
-                result += str(cmd(arg))
+                else:
+                    arg = prompt[i + 2 : j]
+                    i = j
             else:
-                # Unrecognized escapes are turned into the escaped
-                # character itself.
-                result += prompt[i]
+                arg = None
+            if literal:
+                result.append(literal)
+                literal = ''
+            result.append((cmdch, arg))
         else:
-            result += prompt[i]
+            literal += prompt[i]
 
         i = i + 1
 
+    if literal:
+        result.append(literal)
     return result
+
+def _expand_substitution(cmdch, arg):
+    """Return the value of the substitution CMDCH with argument ARG."""
+
+    if cmdch in prompt_substitutions:
+        return str(prompt_substitutions[cmdch](arg))
+    # Unrecognized escapes are turned into the escaped character
+    # itself, followed by their argument.
+    if arg is None:
+        return cmdch
+    return '%s{%s}' % (cmdch, arg)
+
+def _substitution_events(cmdch):
+    """Return the names of the events invalidating the value of the
+    substitution CMDCH, or None if it must always be evaluated.
+    Unrecognized escapes are always evaluated, since a substitution may
+    be added for them later."""
+
+    if cmdch in prompt_substitutions:
+        return getattr(prompt_substitutions[cmdch], 'invalidated_by', None)
+    return None
+
+def expand_prompt(compiled):
+    "Perform the substitutions of a prompt compiled by compile_prompt."
+
+    result = []
+    for item in compiled:
+        if type(item) is tuple:
+            item = _expand_substitution(*item)
+        result.append(item)
+    return ''.join(result)
+
+def substitute_prompt(prompt):
+    "Perform substitutions on PROMPT."
+
+    return expand_prompt(compile_prompt(prompt))
@@ -16,7 +16,50 @@
 
 """Utilities for working with gdb.Types."""
 
+import binascii
+import collections
 import gdb
+import struct
+
+
+# Caches of the results of get_basic_type and of the field names used
+# by has_field, among others, keyed by _type_key.  The caches are
+# cleared whenever the objfiles change, since loading an objfile may
+# complete previously opaque types.
+_basic_types = {}
+_field_names = {}
+_field_layouts = {}
+_struct_decoders = {}
+_enum_infos = {}
+
+def _type_key(type_):
+    """Return the key of a type in the caches of type information.
+
+    gdb.Type objects are not used as keys, since finding one in a
+    dictionary may compare it deeply with the cached types.  The key is
+    the printed type, which includes its qualifiers, and the objfile
+    which owns it.  Types of the same name in the same objfile share a
+    key.
+
+    Returns:
+        The key, or None for types involving an anonymous struct, union
+        or enum, which cannot be told apart by name and are not cached.
+    """
+    name = str(type_)
+    if '{...}' in name:
+        return None
+    return (name, type_.objfile)
+
+
+def _clear_type_caches(*args):
+    """Clear the caches of type information.
+    This accepts and ignores any arguments, so that it can be connected
+    directly to gdb.events."""
+    _basic_types.clear()
+    _field_names.clear()
+    _field_layouts.clear()
+    _struct_decoders.clear()
+    _enum_infos.clear()
 
 
 def get_basic_type(type_):
@@ -30,15 +73,53 @@ def get_basic_type(type_):
         and typedefs/references converted to the underlying type.
     """
 
-    while (type_.code == gdb.TYPE_CODE_REF or
-           type_.code == gdb.TYPE_CODE_RVALUE_REF or
-           type_.code == gdb.TYPE_CODE_TYPEDEF):
-        if (type_.code == gdb.TYPE_CODE_REF or
-            type_.code == gdb.TYPE_CODE_RVALUE_REF):
-            type_ = type_.target()
+    key = _type_key(type_)
+    try:
+        return _basic_types[key]
+    except KeyError:
+        pass
+    basic_type = type_
+    while (basic_type.code == gdb.TYPE_CODE_REF or
+           basic_type.code == gdb.TYPE_CODE_RVALUE_REF or
+           basic_type.code == gdb.TYPE_CODE_TYPEDEF):
+        if (basic_type.code == gdb.TYPE_CODE_REF or
+            basic_type.code == gdb.TYPE_CODE_RVALUE_REF):
+            basic_type = basic_type.target()
+        else:
+            basic_type = basic_type.strip_typedefs()
+    basic_type = basic_type.unqualified()
+    if key is not None:
+        _basic_types[key] = basic_type
+    return basic_type
+
+
+def _get_field_names(type_):
+    """Return the names of the fields of a struct or union type.
+
+    Arguments:
+        type_: The basic struct or union type to examine.
+
+    Returns:
+        A frozenset of the names of the fields of type_ and of all its
+        base classes.
+    """
+
+    key = _type_key(type_)
+    try:
+        return _field_names[key]
+    except KeyError:
+        pass
+    names = set()
+    for f in type_.fields():
+        if f.is_base_class:
+            names.update(_get_field_names(get_basic_type(f.type)))
         else:
-            type_ = type_.strip_typedefs()
-    return type_.unqualified()
+            # NOTE: f.name could be None
+            names.add(f.name)
+    names = frozenset(names)
+    if key is not None:
+        _field_names[key] = names
+    return names
 
 
 def has_field(type_, field):
@@ -60,15 +141,7 @@ def has_field(type_, field):
     if (type_.code != gdb.TYPE_CODE_STRUCT and
         type_.code != gdb.TYPE_CODE_UNION):
         raise TypeError("not a struct or union")
-    for f in type_.fields():
-        if f.is_base_class:
-            if has_field(f.type, field):
-                return True
-        else:
-            # NOTE: f.name could be None
-            if f.name == field:
-                return True
-    return False
+    return field in _get_field_names(type_)
 
 
 def make_enum_dict(enum_type):
@@ -86,11 +159,87 @@ def make_enum_dict(enum_type):
 
     if enum_type.code != gdb.TYPE_CODE_ENUM:
         raise TypeError("not an enum type")
-    enum_dict = {}
-    for field in enum_type.fields():
-        # The enum's value is stored in "enumval".
-        enum_dict[field.name] = field.enumval
-    return enum_dict
+    return dict(get_enum_info(enum_type).by_name)
+
+
+class EnumInfo(object):
+    """Lookup tables for an enum type, as returned by get_enum_info.
+
+    Attributes:
+        by_name: A dictionary mapping the names of the enumerators to
+            their values.
+        by_value: A dictionary mapping values to the name of the first
+            enumerator with that value.
+        flags: A tuple of (value, name) pairs for the enumerators with a
+            non-zero value, sorted by value.
+        is_flag_enum: True if the values in flags have no bits in
+            common, so that the enum can be used as a bitmask.
+    """
+
+    def __init__(self, enum_type):
+        self.by_name = {}
+        self.by_value = {}
+        for field in enum_type.fields():
+            # The enum's value is stored in "enumval".
+            self.by_name[field.name] = field.enumval
+            self.by_value.setdefault(field.enumval, field.name)
+        self.flags = tuple(sorted((value, name)
+                                  for name, value in self.by_name.items()
+                                  if value != 0))
+        self.is_flag_enum = True
+        mask = 0
+        for value, name in self.flags:
+            if value < 0 or value & mask:
+                self.is_flag_enum = False
+                break
+            mask |= value
+
+    def decompose(self, value):
+        """Split VALUE into the enumerators of a flag enum.
+
+        Arguments:
+            value: The integer value to decompose.
+
+        Returns:
+            A pair of the list of the names of the flags set in value,
+            in increasing order of values, and of the remaining bits
+            which do not belong to any enumerator.
+        """
+
+        names = []
+        for flag, name in self.flags:
+            if value & flag == flag:
+                names.append(name)
+                value &= ~flag
+        return names, value
+
+
+def get_enum_info(enum_type):
+    """Return the lookup tables of a program's enum type.
+
+    Arguments:
+        enum_type: The enum to compute the tables for.
+
+    Returns:
+        An EnumInfo object.  It is computed once for each type and
+        cached until the objfiles change, so it must not be modified.
+
+    Raises:
+        TypeError: The type is not an enum.
+    """
+
+    enum_type = get_basic_type(enum_type)
+    if enum_type.code != gdb.TYPE_CODE_ENUM:
+        raise TypeError("not an enum type")
+    key = _type_key(enum_type)
+    try:
+        return _enum_infos[key]
+    except KeyError:
+        pass
+    info = EnumInfo(enum_type)
+    if key is not None:
+        _enum_infos[key] = info
+    return info
 
 
 def deep_items (type_):
@@ -112,6 +261,338 @@ def deep_items (type_):
             for i in deep_items (v.type):
                 yield i
 
+class FieldLayout(collections.namedtuple('FieldLayout',
+                                         ['path', 'bitpos', 'bitsize',
+                                          'type'])):
+    """The location of a field in a struct or union type.
+
+    Attributes:
+        path: A tuple of the names of the fields leading to this field,
+            as would be used to access it from a gdb.Value.  Anonymous
+            struct and union members are left out, and base classes
+            appear under their names.
+        bitpos: The offset of the field, in bits, from the start of the
+            outermost type.
+        bitsize: The size of the field in bits.
+        type: The gdb.Type of the field.
+    """
+
+    __slots__ = ()
+
+
+def field_layout(type_):
+    """Return the layout of all the fields of a struct or union type.
+
+    Arguments:
+        type_: The type to examine.
+            It must be one of gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION.
+
+    Returns:
+        A tuple of FieldLayout objects, one for each non-static field of
+        type_, in declaration order.  The fields of anonymous struct or
+        union members and of base classes are included in place of
+        those members, recursively.  Named struct and union members
+        are not expanded.  The result is cached until the objfiles
+        change.
+
+    Raises:
+        TypeError: The type is not a struct or union.
+    """
+
+    type_ = get_basic_type(type_)
+    if (type_.code != gdb.TYPE_CODE_STRUCT and
+        type_.code != gdb.TYPE_CODE_UNION):
+        raise TypeError("not a struct or union")
+    key = _type_key(type_)
+    try:
+        return _field_layouts[key]
+    except KeyError:
+        pass
+    layout = []
+    for f in type_.fields():
+        if not hasattr(f, 'bitpos'):
+            # A static member.
+            continue
+        if f.is_base_class:
+            prefix = (f.name,)
+        elif f.name is None:
+            code = get_basic_type(f.type).code
+            if code != gdb.TYPE_CODE_STRUCT and code != gdb.TYPE_CODE_UNION:
+                # Unnamed bit-field padding.
+                continue
+            prefix = ()
+        else:
+            bitsize = f.bitsize or f.type.sizeof * 8
+            layout.append(FieldLayout((f.name,), f.bitpos, bitsize, f.type))
+            continue
+        for entry in field_layout(f.type):
+            layout.append(FieldLayout(prefix + entry.path,
+                                      f.bitpos + entry.bitpos,
+                                      entry.bitsize, entry.type))
+    layout = tuple(layout)
+    if key is not None:
+        _field_layouts[key] = layout
+    return layout
+
+# The struct module formats of the scalar types decoded by
+# decode_struct, indexed by size, for unsigned and signed integers and
+# for floating-point types.
+_UNSIGNED_FORMATS = { 1: 'B', 2: 'H', 4: 'I', 8: 'Q' }
+_SIGNED_FORMATS = { 1: 'b', 2: 'h', 4: 'i', 8: 'q' }
+_FLOAT_FORMATS = { 4: 'f', 8: 'd' }
+
+_INTEGER_CODES = (gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR, gdb.TYPE_CODE_ENUM,
+                  gdb.TYPE_CODE_BOOL, gdb.TYPE_CODE_PTR)
+
+def _is_signed(type_):
+    """Return True if the integer type TYPE_ is signed."""
+    if type_.code == gdb.TYPE_CODE_PTR or type_.code == gdb.TYPE_CODE_BOOL:
+        return False
+    return int(gdb.Value(b'\xff' * type_.sizeof, type_)) < 0
+
+def _byte_order(type_, format_):
+    """Return the struct module byte order character of the target.
+    TYPE_ is a scalar type of at least two bytes and FORMAT_ its
+    struct module format; a value of this type is built from known
+    bytes and compared with its little-endian interpretation."""
+    data = bytes(bytearray(range(1, type_.sizeof + 1)))
+    value = gdb.Value(data, type_)
+    if type_.code == gdb.TYPE_CODE_FLT:
+        value = float(value)
+    else:
+        value = int(value)
+    if value == struct.unpack('<' + format_, data)[0]:
+        return '<'
+    return '>'
+
+class _StructDecoder(object):
+    """Decode the raw bytes of objects of a struct or union type.
+
+    The decoder is built from the field layout of the type.  When all
+    the fields are byte-aligned scalars which do not overlap, they are
+    decoded by a single struct.Struct; otherwise, each field has its
+    own decoding function."""
+
+    def __init__(self, type_):
+        layout = field_layout(type_)
+        self.size = type_.sizeof
+        self.names = tuple('.'.join(f.path) for f in layout)
+        self.fields = []
+        order = None
+        for f in layout:
+            basic_type = get_basic_type(f.type)
+            code = basic_type.code
+            size = basic_type.sizeof
+            format_ = None
+            if code in _INTEGER_CODES:
+                if code == gdb.TYPE_CODE_BOOL and size == 1:
+                    format_ = '?'
+                elif code != gdb.TYPE_CODE_BOOL and _is_signed(basic_type):
+                    format_ = _SIGNED_FORMATS.get(size)
+                else:
+                    format_ = _UNSIGNED_FORMATS.get(size)
+            elif code == gdb.TYPE_CODE_FLT:
+                format_ = _FLOAT_FORMATS.get(size)
+            if format_ is not None and order is None and size > 1:
+                order = _byte_order(basic_type, format_)
+            self.fields.append((f, basic_type, format_))
+        self.order = order or '<'
+        self.big_endian = self.order == '>'
+        # The struct module only decodes booleans of one byte.  Wider
+        # ones are decoded as unsigned integers, and converted to bool
+        # afterwards; these are their positions.
+        self.wide_bools = tuple(
+            i for i, (f, basic_type, format_) in enumerate(self.fields)
+            if basic_type.code == gdb.TYPE_CODE_BOOL and format_ != '?')
+
+        # Try to decode all the fields with a single struct.Struct.
+        fmt = self.order
+        end = 0
+        for f, basic_type, format_ in self.fields:
+            if (format_ is None or f.bitpos % 8 != 0
+                or f.bitsize != basic_type.sizeof * 8
+                or f.bitpos // 8 < end):
+                self.struct = None
+                break
+            start = f.bitpos // 8
+            if start > end:
+                fmt += '%dx' % (start - end)
+            fmt += format_
+            end = start + basic_type.sizeof
+        else:
+            self.struct = struct.Struct(fmt)
+
+        self.decoders = tuple(self._make_decoder(f, basic_type, format_)
+                              for f, basic_type, format_ in self.fields)
+
+    def _make_decoder(self, f, basic_type, format_):
+        """Return a function decoding the field F.
+        The function is called with the bytes and offset of the object
+        and the AS_DICT argument of decode."""
+        start = f.bitpos // 8
+        if format_ is not None and (f.bitpos % 8 != 0
+                                    or f.bitsize != basic_type.sizeof * 8):
+            signed = format_ in _SIGNED_FORMATS.values()
+            is_bool = basic_type.code == gdb.TYPE_CODE_BOOL
+            return lambda data, offset, as_dict: self._decode_bits(
+                data, offset, f.bitpos, f.bitsize, signed, is_bool)
+        if format_ is not None:
+            unpacker = struct.Struct(self.order + format_)
+            if basic_type.code == gdb.TYPE_CODE_BOOL and format_ != '?':
+                return lambda data, offset, as_dict: bool(
+                    unpacker.unpack_from(data, offset + start)[0])
+            return lambda data, offset, as_dict: unpacker.unpack_from(
+                data, offset + start)[0]
+        end = start + f.type.sizeof
+        if (basic_type.code == gdb.TYPE_CODE_STRUCT
+            or basic_type.code == gdb.TYPE_CODE_UNION):
+            decoder = _get_struct_decoder(basic_type)
+            return lambda data, offset, as_dict: decoder.decode(
+                data, offset + start, as_dict)
+        return lambda data, offset, as_dict: gdb.Value(
+            bytes(data[offset + start:offset + end]), f.type)
+
+    def _decode_bits(self, data, offset, bitpos, bitsize, signed, is_bool):
+        """Decode a bit-field."""
+        start = offset + bitpos // 8
+        end = offset + (bitpos + bitsize + 7) // 8
+        chunk = bytearray(data[start:end])
+        if self.big_endian:
+            shift = len(chunk) * 8 - bitpos % 8 - bitsize
+        else:
+            chunk.reverse()
+            shift = bitpos % 8
+        value = int(binascii.hexlify(chunk), 16) >> shift
+        value &= (1 << bitsize) - 1
+        if is_bool:
+            return bool(value)
+        if signed and value >> (bitsize - 1):
+            value -= 1 << bitsize
+        return value
+
+    def decode(self, data, offset=0, as_dict=False):
+        """Decode the object at OFFSET in DATA."""
+        if len(data) < offset + self.size:
+            raise ValueError("buffer too small for the type")
+        if self.struct is not None:
+            values = self.struct.unpack_from(data, offset)
+            if self.wide_bools:
+                values = list(values)
+                for i in self.wide_bools:
+                    values[i] = bool(values[i])
+                values = tuple(values)
+        else:
+            values = tuple(decoder(data, offset, as_dict)
+                           for decoder in self.decoders)
+        if as_dict:
+            return dict(zip(self.names, values))
+        return values
+
+def _get_struct_decoder(type_):
+    """Return the cached _StructDecoder of the struct or union TYPE_."""
+    type_ = get_basic_type(type_)
+    key = _type_key(type_)
+    try:
+        return _struct_decoders[key]
+    except KeyError:
+        pass
+    decoder = _StructDecoder(type_)
+    if key is not None:
+        _struct_decoders[key] = decoder
+    return decoder
+
+
+def decode_struct(type_, data, as_dict=False):
+    """Decode the raw bytes of an object of a struct or union type.
+
+    Arguments:
+        type_: The type of the object.
+            It must be one of gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION.
+        data: An object supporting the buffer protocol, such as the
+            result of gdb.Inferior.read_memory, holding at least
+            type_.sizeof bytes.
+        as_dict: If True, return a dictionary instead of a tuple.
+
+    Returns:
+        A tuple of the values of the fields of type_, in the order of
+        field_layout, or a dictionary mapping the paths of the fields,
+        joined with '.', to their values.  Integers, characters,
+        enumerators and pointers are decoded to Python integers,
+        booleans to bool and floating-point numbers to float.  Named
+        struct and union members are decoded recursively.  Other
+        fields, such as arrays, are returned as gdb.Value objects built
+        from the bytes, without reading memory.
+
+    Raises:
+        TypeError: The type is not a struct or union.
+        ValueError: The buffer is too small.
+    """
+
+    return _get_struct_decoder(type_).decode(data, 0, as_dict)
+
+
+def read_struct(type_, address, inferior=None, as_dict=False):
+    """Read and decode an object of a struct or union type.
+
+    Arguments:
+        type_: The type of the object.
+            It must be one of gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION.
+        address: The address of the object.
+        inferior: The gdb.Inferior to read from.  The default is the
+            selected inferior.
+        as_dict: If True, return a dictionary instead of a tuple.
+
+    Returns:
+        The decoded object, as returned by decode_struct.  The whole
+        object is read with a single call to gdb.Inferior.read_memory.
+
+    Raises:
+        TypeError: The type is not a struct or union.
+        gdb.MemoryError: The memory could not be read.
+    """
+
+    return read_structs(type_, (address,), inferior, as_dict)[0]
+
+
+def read_structs(type_, addresses, inferior=None, as_dict=False):
+    """Read and decode several objects of a struct or union type.
+
+    This is like read_struct, except that ADDRESSES is an iterable of
+    addresses, and a list of the decoded objects is returned.
+    """
+
+    decoder = _get_struct_decoder(type_)
+    if inferior is None:
+        inferior = gdb.selected_inferior()
+    read_memory = inferior.read_memory
+    size = decoder.size
+    return [decoder.decode(read_memory(address, size), 0, as_dict)
+            for address in addresses]
+
+def _decode_scalars(type_, data):
+    """Decode the raw bytes DATA of consecutive objects of the integer,
+    character, enumeration, boolean or floating-point type TYPE_ with a
+    single call to struct.unpack_from.  Return a tuple of Python integers
+    or floats, or None if TYPE_ cannot be decoded this way."""
+    type_ = get_basic_type(type_)
+    size = type_.sizeof
+    if type_.code == gdb.TYPE_CODE_FLT:
+        format_ = _FLOAT_FORMATS.get(size)
+    elif type_.code in _INTEGER_CODES and type_.code != gdb.TYPE_CODE_PTR:
+        if _is_signed(type_):
+            format_ = _SIGNED_FORMATS.get(size)
+        else:
+            format_ = _UNSIGNED_FORMATS.get(size)
+    else:
+        return None
+    if format_ is None:
+        return None
+    order = '<'
+    if size > 1:
+        order = _byte_order(type_, format_)
+    count = len(data) // size
+    return struct.unpack_from('%s%d%s' % (order, count, format_), data)
+
 class TypePrinter(object):
     """The base class for type printers.
 
@@ -125,6 +606,9 @@ class TypePrinter(object):
     object which has a 'recognize' method.  This method must accept a
     gdb.Type argument and either return None, meaning that the type
     was not recognized, or a string naming the type.
+
+    Instead of a 'recognize' method, the object may have 'type_names'
+    and 'type_prefixes' attributes; see TypeNameRecognizer.
     """
 
     def __init__(self, name):
@@ -134,38 +618,191 @@ class TypePrinter(object):
     def instantiate(self):
         return None
 
-# Helper function for computing the list of type recognizers.
-def _get_some_type_recognizers(result, plist):
+class TypeNameRecognizer(object):
+    """A type recognizer substituting type names from tables.
+
+    Recognizers of this kind are not called for each type; instead,
+    their tables are merged into dictionaries which are consulted by
+    apply_type_recognizers.
+
+    Attributes:
+        type_names: A dictionary mapping exact type names to the names
+            to print instead.
+        type_prefixes: A dictionary mapping prefixes of type names to
+            replacement prefixes.  When several prefixes match a type
+            name, the longest one is used.  An exact match in
+            type_names takes precedence over the prefixes.
+    """
+
+    def __init__(self, type_names=None, type_prefixes=None):
+        self.type_names = dict(type_names or {})
+        self.type_prefixes = dict(type_prefixes or {})
+        self._index = None
+
+    def recognize(self, type_obj):
+        if self._index is None:
+            self._index = _TypeRecognizerIndex([self])
+        return self._index.lookup(type_obj)
+
+class TypeNamePrinter(TypePrinter):
+    """A type printer substituting type names from tables.
+
+    Arguments:
+        name: The name of the type printer.
+        type_names: A dictionary mapping exact type names to the names
+            to print instead.
+        type_prefixes: A dictionary mapping prefixes of type names to
+            replacement prefixes.
+
+    The tables are read each time the printer is instantiated; see
+    TypeNameRecognizer.
+    """
+
+    def __init__(self, name, type_names=None, type_prefixes=None):
+        super(TypeNamePrinter, self).__init__(name)
+        self.type_names = dict(type_names or {})
+        self.type_prefixes = dict(type_prefixes or {})
+
+    def instantiate(self):
+        return TypeNameRecognizer(self.type_names, self.type_prefixes)
+
+class _TypeRecognizerIndex(object):
+    """The type names and prefixes declared by a list of recognizers.
+
+    The tables of all recognizers with 'type_names' or 'type_prefixes'
+    attributes are merged into two dictionaries, mapping each name or
+    prefix to the position of the first recognizer declaring it and the
+    replacement.  The other recognizers are called in order, but only
+    up to the position of the declared name found, if any, so the
+    result is the same as trying every recognizer in turn."""
+
+    def __init__(self, recognizers):
+        self.names = {}
+        self.prefixes = {}
+        self.callables = []
+        for position, r in enumerate(recognizers):
+            type_names = getattr(r, 'type_names', None)
+            type_prefixes = getattr(r, 'type_prefixes', None)
+            if type_names is None and type_prefixes is None:
+                self.callables.append((position, r))
+                continue
+            for name, replacement in (type_names or {}).items():
+                self.names.setdefault(name, (position, replacement))
+            for prefix, replacement in (type_prefixes or {}).items():
+                self.prefixes.setdefault(prefix, (position, replacement))
+        self.prefix_lengths = sorted(set(len(p) for p in self.prefixes),
+                                     reverse=True)
+
+    def lookup(self, type_obj):
+        """Return the name to print for TYPE_OBJ, or None."""
+        found = None
+        name = type_obj.name
+        if name is not None:
+            found = self.names.get(name)
+            for length in self.prefix_lengths:
+                if length > len(name):
+                    continue
+                entry = self.prefixes.get(name[:length])
+                if entry is not None and (found is None
+                                          or entry[0] < found[0]):
+                    found = (entry[0], entry[1] + name[length:])
+        for position, r in self.callables:
+            if found is not None and position > found[0]:
+                break
+            result = r.recognize(type_obj)
+            if result is not None:
+                return result
+        if found is not None:
+            return found[1]
+        return None
+
+# The type recognizers most recently computed by get_type_recognizers,
+# and the enabled type printers they were instantiated from.  The
+# recognizers are reused until a type printer is registered, enabled or
+# disabled, or the set of objfiles changes.
+_type_recognizers = None
+_type_recognizers_printers = None
+_type_recognizer_index = None
+
+def _invalidate_type_recognizers(*args):
+    """Forget the cached type recognizers.
+    This accepts and ignores any arguments, so that it can be connected
+    directly to gdb.events."""
+    global _type_recognizers
+    global _type_recognizers_printers
+    global _type_recognizer_index
+    _type_recognizers = None
+    _type_recognizers_printers = None
+    _type_recognizer_index = None
+
+class _TypeRecognizers(list):
+    """The list of type recognizers for a single type-printing operation.
+    In addition to the recognizers themselves, this remembers the result
+    of applying them to each type, so that a type appearing several
+    times in the output is only looked up once, and carries the index
+    of the names declared by the recognizers."""
+
+    def __init__(self, recognizers, index):
+        super(_TypeRecognizers, self).__init__(recognizers)
+        self.results = {}
+        self.names_index = index
+
+# Helper function for computing the list of enabled type printers.
+def _get_some_type_printers(result, plist):
     for printer in plist:
         if printer.enabled:
-            inst = printer.instantiate()
-            if inst is not None:
-                result.append(inst)
+            result.append(printer)
     return None
 
 def get_type_recognizers():
     "Return a list of the enabled type recognizers for the current context."
-    result = []
+    global _type_recognizers
+    global _type_recognizers_printers
+    global _type_recognizer_index
+    printers = []
 
     # First try the objfiles.
     for objfile in gdb.objfiles():
-        _get_some_type_recognizers(result, objfile.type_printers)
+        _get_some_type_printers(printers, objfile.type_printers)
     # Now try the program space.
-    _get_some_type_recognizers(result, gdb.current_progspace().type_printers)
+    _get_some_type_printers(printers, gdb.current_progspace().type_printers)
     # Finally, globals.
-    _get_some_type_recognizers(result, gdb.type_printers)
+    _get_some_type_printers(printers, gdb.type_printers)
+
+    # The printers may have been added to the type_printers lists, or
+    # enabled or disabled, directly; only reuse the recognizers if the
+    # enabled printers are still the same.
+    if _type_recognizers is None or _type_recognizers_printers != printers:
+        recognizers = []
+        for printer in printers:
+            inst = printer.instantiate()
+            if inst is not None:
+                recognizers.append(inst)
+        _type_recognizers = recognizers
+        _type_recognizers_printers = printers
+        _type_recognizer_index = _TypeRecognizerIndex(recognizers)
 
-    return result
+    return _TypeRecognizers(_type_recognizers, _type_recognizer_index)
 
 def apply_type_recognizers(recognizers, type_obj):
     """Apply the given list of type recognizers to the type TYPE_OBJ.
     If any recognizer in the list recognizes TYPE_OBJ, returns the name
-    given by the recognizer.  Otherwise, this returns None."""
-    for r in recognizers:
-        result = r.recognize(type_obj)
-        if result is not None:
-            return result
-    return None
+    given by the recognizer.  Otherwise, this returns None.
+    Recognizers declaring type names, such as TypeNameRecognizer, are
+    resolved through a dictionary instead of being called."""
+    results = getattr(recognizers, 'results', None)
+    key = None
+    if results is not None:
+        key = _type_key(type_obj)
+        if key in results:
+            return results[key]
+    index = getattr(recognizers, 'names_index', None)
+    if index is None:
+        index = _TypeRecognizerIndex(recognizers)
+    result = index.lookup(type_obj)
+    if key is not None:
+        results[key] = result
+    return result
 
 def register_type_printer(locus, printer):
     """Register a type printer.
@@ -176,3 +813,9 @@ def register_type_printer(locus, printer):
     if locus is None:
         locus = gdb
     locus.type_printers.insert(0, printer)
+    _invalidate_type_recognizers()
+
+gdb.events.new_objfile.connect(_invalidate_type_recognizers)
+gdb.events.clear_objfiles.connect(_invalidate_type_recognizers)
+gdb.events.new_objfile.connect(_clear_type_caches)
+gdb.events.clear_objfiles.connect(_clear_type_caches)
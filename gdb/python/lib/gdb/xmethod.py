@@ -16,9 +16,14 @@
 
 """Utilities for defining xmethods"""
 
+import bisect
 import gdb
+import gdb.types
+import itertools
+import operator
 import re
 import sys
+import timeit
 
 
 if sys.version_info[0] > 2:
@@ -47,6 +52,15 @@ class XMethod(object):
         self.name = name
         self.enabled = True
 
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = value
+        _invalidate_match_results()
+
 
 class XMethodMatcher(object):
     """Abstract base class for matching an xmethod.
@@ -67,6 +81,24 @@ class XMethodMatcher(object):
             the 'match' method below to know how this sequence is used.
             This attribute is None if the matcher chooses not have any
             xmethods managed by it.
+        class_names: A sequence of the exact names (tags of the
+            unqualified types) of the classes this matcher serves, or
+            None.  If it is not None, the 'match' method is only invoked
+            for these classes.
+        method_names: A sequence of the exact names of the methods this
+            matcher serves, or None.  If it is not None, the 'match'
+            method is only invoked for these methods.
+
+    The 'class_names' and 'method_names' attributes let GDB find the
+    matchers to consult with a dictionary lookup; they should not change
+    once the matcher is registered.  Matchers which declare neither are
+    consulted for every class and method.
+
+    GDB caches the workers returned by the 'match' method for a given
+    class type and method name, until a matcher is registered or the
+    'enabled' attribute of a matcher or an xmethod changes.  Hence the
+    'match' method should only depend on its arguments and on the
+    enabled state of the xmethods.
     """
 
     def __init__(self, name):
@@ -78,6 +110,17 @@ class XMethodMatcher(object):
         self.name = name
         self.enabled = True
         self.methods = None
+        self.class_names = None
+        self.method_names = None
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = value
+        _invalidate_match_results()
 
     def match(self, class_type, method_name):
         """Match class type and method name.
@@ -148,6 +191,57 @@ class XMethodWorker(object):
         raise NotImplementedError("XMethodWorker __call__")
 
 
+# Characters which have a special meaning in regular expressions.
+_REGEXP_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+# A helper function for _compile_name_matcher which returns the only
+# string matched by re.match(REGEXP, ...) if REGEXP matches exactly one
+# string, or None otherwise.
+
+def _regexp_literal(regexp):
+    if regexp.startswith("^"):
+        regexp = regexp[1:]
+    if not regexp.endswith("$"):
+        return None
+    regexp = regexp[:-1]
+    chars = []
+    escaped = False
+    for c in regexp:
+        if escaped:
+            # Escape sequences like '\d' are character classes.
+            if c.isalnum():
+                return None
+            chars.append(c)
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c in _REGEXP_SPECIAL_CHARS:
+            return None
+        else:
+            chars.append(c)
+    if escaped:
+        return None
+    return "".join(chars)
+
+
+# A helper function for SimpleXMethodMatcher which converts the
+# CLASS_MATCHER or METHOD_MATCHER argument of its constructor to a
+# 2-tuple: (<frozenset of exact names>, <compiled regular expression>),
+# exactly one of which is None.
+
+def _compile_name_matcher(matcher):
+    if isinstance(matcher, basestring):
+        literal = _regexp_literal(matcher)
+        if literal is not None:
+            return (frozenset([literal]), None)
+        return (None, re.compile(matcher))
+    if hasattr(matcher, "match"):
+        # Already a compiled regular expression.
+        return (None, matcher)
+    return (frozenset(matcher), None)
+
+
 class SimpleXMethodMatcher(XMethodMatcher):
     """A utility class to implement simple xmethod mathers and workers.
 
@@ -180,8 +274,12 @@ class SimpleXMethodMatcher(XMethodMatcher):
             name: Name of the xmethod matcher.
             class_matcher: A regular expression used to match the name of the
                 class whose method this xmethod is implementing/replacing.
+                It can be a string or a compiled regular expression, or
+                a sequence of the exact names of the classes.
             method_matcher: A regular expression used to match the name of the
-                method this xmethod is implementing/replacing.
+                method this xmethod is implementing/replacing.  It can be
+                a string or a compiled regular expression, or a sequence
+                of the exact names of the methods.
             method_function: A Python callable which would be called via the
                 'invoke' method of the worker returned by the objects of this
                 class.  This callable should accept the object (*this) as the
@@ -191,22 +289,37 @@ class SimpleXMethodMatcher(XMethodMatcher):
             arg_types: The gdb.Type objects corresponding to the arguments that
                 this xmethod takes. It can be None, or an empty sequence,
                 or a single gdb.Type object, or a sequence of gdb.Type objects.
+
+        Regular expression strings are compiled once, here.  Those which
+        can only match a single name, like '^geta$', are treated as exact
+        names, and set the 'class_names' or 'method_names' attribute of
+        the matcher.
         """
         XMethodMatcher.__init__(self, name)
         assert callable(method_function), (
             "The 'method_function' argument to 'SimpleXMethodMatcher' "
             "__init__ method should be a callable.")
         self._method_function = method_function
-        self._class_matcher = class_matcher
-        self._method_matcher = method_matcher
+        self.class_names, self._class_regexp = (
+            _compile_name_matcher(class_matcher))
+        self.method_names, self._method_regexp = (
+            _compile_name_matcher(method_matcher))
         self._arg_types = arg_types
 
     def match(self, class_type, method_name):
-        cm = re.match(self._class_matcher, str(class_type.unqualified().tag))
-        mm = re.match(self._method_matcher, method_name)
-        if cm and mm:
-            return SimpleXMethodMatcher.SimpleXMethodWorker(
-                self._method_function, self._arg_types)
+        if self.method_names is not None:
+            if method_name not in self.method_names:
+                return None
+        elif not self._method_regexp.match(method_name):
+            return None
+        class_name = str(class_type.unqualified().tag)
+        if self.class_names is not None:
+            if class_name not in self.class_names:
+                return None
+        elif not self._class_regexp.match(class_name):
+            return None
+        return SimpleXMethodMatcher.SimpleXMethodWorker(
+            self._method_function, self._arg_types)
 
 
 # A helper function for register_xmethod_matcher which returns an error
@@ -227,16 +340,366 @@ def _validate_xmethod_matcher(matcher):
         return ValueError("Xmethod matcher name cannot contain ';' in it")
 
 
-# A helper function for register_xmethod_matcher which looks up an 
-# xmethod matcher with NAME in LOCUS.  Returns the index of the xmethod
-# matcher in 'xmethods' sequence attribute of the LOCUS.  If NAME is not
-# found in LOCUS, then -1 is returned.
+# A helper function for _XMethodMatcherRegistry which returns a prefix
+# of all the names re.match(REGEXP, ...) can match, possibly the empty
+# string.
+
+def _regexp_prefix(regexp):
+    if "|" in regexp:
+        return ""
+    if regexp.startswith("^"):
+        regexp = regexp[1:]
+    prefix = []
+    escaped = False
+    for c in regexp:
+        if escaped:
+            if c.isalnum():
+                break
+            prefix.append(c)
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c in "*?{":
+            # The previous character is optional.
+            if prefix:
+                prefix.pop()
+            break
+        elif c in _REGEXP_SPECIAL_CHARS:
+            break
+        else:
+            prefix.append(c)
+    return "".join(prefix)
+
+
+# A helper function for _XMethodMatcherRegistry which converts the
+# 'class_names' or 'method_names' attribute of a matcher to a frozenset,
+# or None if the matcher does not declare it.
+
+def _declared_names(matcher, attr_name):
+    names = getattr(matcher, attr_name, None)
+    if names is None:
+        return None
+    if isinstance(names, basestring):
+        return frozenset([names])
+    return frozenset(names)
+
+
+class _XMethodMatcherRegistry(object):
+    """Registry of the xmethod matchers registered with a locus.
+
+    The registry indexes the 'xmethods' list of the locus, which it
+    updates itself when matchers are registered.  It indexes the
+    matchers by name, for register_xmethod_matcher and the xmethod
+    commands.  For lookups, matchers which declare the names of
+    the classes they serve are indexed by class name, the ones which
+    only declare the names of the methods they serve are indexed by
+    method name, and the rest are consulted for every lookup.
+
+    Each matcher is given a key such that the matchers at the front of
+    the locus have the smallest keys.
+    """
+
+    def __init__(self, matchers):
+        self.matchers = matchers
+        self._first_key = 0
+        self._by_name = {}
+        self._sorted_names = []
+        self._by_class = {}
+        self._by_method = {}
+        self._fallback = []
+        for key, matcher in enumerate(self.matchers):
+            self._add(key, matcher)
+        self._snapshot()
+
+    def _snapshot(self):
+        # Keeping the indexed matchers alive guarantees that their ids
+        # are not reused by other objects.
+        self._indexed = tuple(self.matchers)
+        self._ids = tuple(map(id, self._indexed))
+
+    def is_current(self, matchers):
+        """Return whether the registry still indexes MATCHERS, the
+        'xmethods' list of its locus.
+
+        The ids of all the matchers in the list are compared with the
+        ones indexed, so that any direct edit of the list is noticed,
+        including the replacement of a matcher in the middle of it.
+        """
+        return (matchers is self.matchers
+                and len(matchers) == len(self._ids)
+                and tuple(map(id, matchers)) == self._ids)
+
+    def _add(self, key, matcher):
+        if matcher.name not in self._by_name:
+            self._by_name[matcher.name] = (key, matcher)
+            bisect.insort(self._sorted_names, matcher.name)
+        class_names = _declared_names(matcher, "class_names")
+        method_names = _declared_names(matcher, "method_names")
+        if class_names is not None:
+            for class_name in class_names:
+                self._by_class.setdefault(class_name, []).append(
+                    (key, matcher, method_names))
+        elif method_names is not None:
+            for method_name in method_names:
+                self._by_method.setdefault(method_name, []).append(
+                    (key, matcher, None))
+        else:
+            self._fallback.append((key, matcher, None))
+
+    def find(self, name):
+        """Return the matcher named NAME, or None."""
+        entry = self._by_name.get(name)
+        if entry is None:
+            return None
+        return entry[1]
+
+    def find_matching(self, name_re):
+        """Return the matchers whose name matches NAME_RE.
+
+        Arguments:
+            name_re: A compiled regular expression.
+
+        Returns:
+            The list of the matching matchers, in the order in which they
+            appear in the locus.
+        """
+        if (len(self._by_name) != len(self.matchers)
+                or name_re.flags & re.IGNORECASE):
+            # The index cannot answer this, scan the whole locus.
+            return [m for m in self.matchers if name_re.match(m.name)]
+        prefix = _regexp_prefix(name_re.pattern)
+        found = []
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        for name in itertools.islice(self._sorted_names, start, None):
+            if not name.startswith(prefix):
+                break
+            if name_re.match(name):
+                found.append(self._by_name[name])
+        found.sort(key=operator.itemgetter(0))
+        return [entry[1] for entry in found]
+
+    def prepend(self, matcher):
+        """Add MATCHER in front of the other matchers."""
+        self._first_key -= 1
+        self.matchers.insert(0, matcher)
+        self._add(self._first_key, matcher)
+        self._snapshot()
+
+    def remove(self, matcher):
+        """Remove MATCHER, which must be registered by its name."""
+        key = self._by_name.pop(matcher.name)[0]
+        del self._sorted_names[bisect.bisect_left(self._sorted_names,
+                                                  matcher.name)]
+        self.matchers.remove(matcher)
+        for table, attr_name in ((self._by_class, "class_names"),
+                                 (self._by_method, "method_names")):
+            for name in _declared_names(matcher, attr_name) or ():
+                entries = [e for e in table.get(name, ()) if e[0] != key]
+                if entries:
+                    table[name] = entries
+                else:
+                    table.pop(name, None)
+        self._fallback = [e for e in self._fallback if e[0] != key]
+        self._snapshot()
+
+    def lookup(self, class_name, method_name):
+        """Return the matchers to consult for CLASS_NAME and METHOD_NAME.
+
+        The matchers are returned in the order in which they appear in
+        the locus.
+        """
+        candidates = [entry for entry in self._by_class.get(class_name, ())
+                      if entry[2] is None or method_name in entry[2]]
+        candidates.extend(self._by_method.get(method_name, ()))
+        if not candidates:
+            return [entry[1] for entry in self._fallback]
+        candidates.extend(self._fallback)
+        candidates.sort(key=operator.itemgetter(0))
+        return [entry[1] for entry in candidates]
+
+
+def _get_xmethod_matcher_registry(locus):
+    """Return the registry of the xmethod matchers of LOCUS.
+
+    The registry is rebuilt if the 'xmethods' list of the LOCUS was
+    modified without going through register_xmethod_matcher.
+
+    Arguments:
+        locus: A gdb.Objfile, a gdb.Progspace, or the gdb module.
+    """
+    registry = getattr(locus, "_xmethod_matcher_registry", None)
+    if registry is None or not registry.is_current(locus.xmethods):
+        registry = _XMethodMatcherRegistry(locus.xmethods)
+        locus._xmethod_matcher_registry = registry
+    return registry
+
+
+class XMethodWorkerStats(object):
+    """Statistics of the xmethod workers of a matcher for a method.
+
+    Attributes:
+        calls: A dict mapping the names of the worker methods
+            ('get_arg_types', 'get_result_type' and '__call__') to the
+            number of times they were invoked.
+        seconds: A dict mapping the names of the worker methods to the
+            total time, in seconds, spent in them.
+    """
 
-def _lookup_xmethod_matcher(locus, name):
-    for i in range(0, len(locus.xmethods)):
-        if locus.xmethods[i].name == name:
-            return i
-    return -1
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def _time(self, operation, function, args):
+        start = timeit.default_timer()
+        try:
+            return function(*args)
+        finally:
+            elapsed = timeit.default_timer() - start
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            self.seconds[operation] = (self.seconds.get(operation, 0.0)
+                                       + elapsed)
+
+
+class _ProfiledXMethodWorker(object):
+    """Wrapper of an xmethod worker which records its statistics.
+
+    Only the methods GDB invokes are timed.  The 'get_result_type'
+    method stays optional: it is only available if the wrapped worker
+    provides it.
+    """
+
+    def __init__(self, worker, stats):
+        self._worker = worker
+        self._stats = stats
+
+    def __getattr__(self, name):
+        attr = getattr(self._worker, name)
+        if name not in ("get_arg_types", "get_result_type"):
+            return attr
+        return lambda *args: self._stats._time(name, attr, args)
+
+    def __call__(self, *args):
+        return self._stats._time("__call__", self._worker, args)
+
+
+# Whether _compute_match_results wraps the workers to collect their
+# statistics in _worker_stats, keyed by (matcher name, method name).
+_collect_worker_stats = False
+_worker_stats = {}
+
+
+def _set_collect_worker_stats(value):
+    """Start or stop collecting xmethod worker statistics."""
+    global _collect_worker_stats
+    _collect_worker_stats = value
+    # Drop the cached workers, which are wrapped or not.
+    _invalidate_match_results()
+
+
+def get_worker_stats():
+    """Return the statistics collected for the xmethod workers.
+
+    Statistics are only collected while 'set xmethod-stats' is on.
+
+    Returns:
+        A dict mapping (<matcher name>, <method name>) pairs to
+        XMethodWorkerStats objects.
+    """
+    return _worker_stats
+
+
+def clear_worker_stats():
+    """Discard the statistics collected for the xmethod workers."""
+    _worker_stats.clear()
+
+
+# A helper function for _compute_match_results which wraps the worker
+# or workers in MATCH_RESULT, returned by the matcher named MATCHER_NAME
+# for METHOD_NAME, so that their statistics are collected.
+
+def _profile_match_result(match_result, matcher_name, method_name):
+    key = (matcher_name, method_name)
+    stats = _worker_stats.get(key)
+    if stats is None:
+        stats = XMethodWorkerStats()
+        _worker_stats[key] = stats
+    # GDB accepts any sequence of workers, or a single worker.
+    if (hasattr(type(match_result), "__getitem__")
+            and not isinstance(match_result, dict)):
+        return [_ProfiledXMethodWorker(worker, stats)
+                for worker in match_result]
+    return _ProfiledXMethodWorker(match_result, stats)
+
+
+# The results of _get_match_results, keyed by the gdb.types._type_key of
+# the class type and the method name.
+# They are only valid for _match_results_progspace, and are discarded by
+# _invalidate_match_results whenever the registered matchers or their
+# enabled state may have changed.
+_match_results = {}
+_match_results_progspace = None
+
+
+def _invalidate_match_results():
+    """Discard the cached results of _get_match_results."""
+    global _match_results_progspace
+    _match_results.clear()
+    _match_results_progspace = None
+
+
+def _get_match_results(class_type, method_name):
+    """Internal function called from GDB to match xmethods.
+
+    Invokes the 'match' method of the enabled xmethod matchers registered
+    with the objfiles, the current progspace and globally (in this order)
+    which may serve CLASS_TYPE and METHOD_NAME.  The results are cached,
+    see _invalidate_match_results.
+
+    Arguments:
+        class_type: The class type (gdb.Type object) to match.
+        method_name: The name (string) of the method to match.
+
+    Returns:
+        A list of the results of the 'match' methods which are not None.
+    """
+    global _match_results_progspace
+    progspace = gdb.current_progspace()
+    if progspace != _match_results_progspace:
+        _invalidate_match_results()
+        _match_results_progspace = progspace
+    type_key = gdb.types._type_key(class_type)
+    if type_key is None:
+        return _compute_match_results(class_type, method_name)
+    key = (type_key, method_name)
+    results = _match_results.get(key)
+    if results is None:
+        results = _compute_match_results(class_type, method_name)
+        _match_results[key] = results
+    return results
+
+
+# A helper function for _get_match_results which invokes the matchers
+# and returns the list of their results.
+
+def _compute_match_results(class_type, method_name):
+    class_name = str(class_type.unqualified().tag)
+    results = []
+    loci = list(gdb.objfiles())
+    loci.append(gdb.current_progspace())
+    loci.append(gdb)
+    for locus in loci:
+        registry = _get_xmethod_matcher_registry(locus)
+        for matcher in registry.lookup(class_name, method_name):
+            if not matcher.enabled:
+                continue
+            result = matcher.match(class_type, method_name)
+            if result is None:
+                continue
+            if _collect_worker_stats:
+                result = _profile_match_result(result, matcher.name,
+                                               method_name)
+            results.append(result)
+    return results
 
 
 def register_xmethod_matcher(locus, matcher, replace=False):
@@ -263,13 +726,29 @@ def register_xmethod_matcher(locus, matcher, replace=False):
         locus_name = "global"
     else:
         locus_name = locus.filename
-    index = _lookup_xmethod_matcher(locus, matcher.name)
-    if index >= 0:
+    registry = _get_xmethod_matcher_registry(locus)
+    existing = registry.find(matcher.name)
+    if existing is not None:
         if replace:
-            del locus.xmethods[index]
+            registry.remove(existing)
         else:
             raise RuntimeError("Xmethod matcher already registered with "
                                "%s: %s" % (locus_name, matcher.name))
     if gdb.parameter("verbose"):
-        gdb.write("Registering xmethod matcher '%s' with %s' ...\n")
-    locus.xmethods.insert(0, matcher)
+        gdb.write("Registering xmethod matcher '%s' with %s ...\n"
+                  % (matcher.name, locus_name))
+    registry.prepend(matcher)
+    _invalidate_match_results()
+
+
+def _on_objfiles_changed(event):
+    """Discard the cached match results.
+
+    Xmethod matchers, like the types they match, come and go with the
+    objfiles.
+    """
+    _invalidate_match_results()
+
+
+gdb.events.new_objfile.connect(_on_objfiles_changed)
+gdb.events.clear_objfiles.connect(_on_objfiles_changed)
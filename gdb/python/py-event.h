@@ -58,6 +58,7 @@ extern int emit_inferior_call_event (inferior_call_kind kind,
 extern int emit_register_changed_event (struct frame_info *frame,
 				        int regnum);
 extern int emit_memory_changed_event (CORE_ADDR addr, ssize_t len);
+extern int emit_param_changed_event (const char *param, const char *value);
 extern int evpy_emit_event (PyObject *event,
                             eventregistry_object *registry);
 
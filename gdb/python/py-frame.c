@@ -617,6 +617,16 @@ gdbpy_selected_frame (PyObject *self, PyObject *args)
   return frame_info_to_frame_object (frame);
 }
 
+/* Implementation of gdb.frame_cache_generation () -> Integer.
+   Returns a number which changes each time the frame cache is
+   flushed.  */
+
+PyObject *
+gdbpy_frame_cache_generation (PyObject *self, PyObject *args)
+{
+  return PyLong_FromUnsignedLong (get_frame_cache_generation ());
+}
+
 /* Implementation of gdb.stop_reason_string (Integer) -> String.
    Return a string explaining the unwind stop reason.  */
 
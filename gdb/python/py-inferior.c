@@ -182,6 +182,31 @@ python_inferior_exit (struct inferior *inf)
     gdbpy_print_stack ();
 }
 
+/* Callback, registered as an observer, that notifies Python listeners
+   when a parameter has been changed by a 'set' command.  */
+
+static void
+python_on_param_change (const char *param, const char *value)
+{
+  gdbpy_enter enter_py (target_gdbarch (), current_language);
+
+  if (emit_param_changed_event (param, value) < 0)
+    gdbpy_print_stack ();
+}
+
+/* Callback, registered as an observer, that notifies Python listeners
+   when the user has selected another inferior, thread or frame.  */
+
+static void
+python_on_user_selected_context_change (user_selected_what selection)
+{
+  gdbpy_enter enter_py (target_gdbarch (), current_language);
+
+  if (!evregpy_no_listeners_p (gdb_py_events.selected_context_changed)
+      && evpy_emit_event (NULL, gdb_py_events.selected_context_changed) < 0)
+    gdbpy_print_stack ();
+}
+
 /* Callback used to notify Python listeners about new objfiles loaded in the
    inferior.  OBJFILE may be NULL which means that the objfile list has been
    cleared (emptied).  */
@@ -916,6 +941,9 @@ gdbpy_initialize_inferior (void)
   gdb::observers::new_objfile.attach (python_new_objfile);
   gdb::observers::inferior_added.attach (python_new_inferior);
   gdb::observers::inferior_removed.attach (python_inferior_deleted);
+  gdb::observers::command_param_changed.attach (python_on_param_change);
+  gdb::observers::user_selected_context_changed.attach
+    (python_on_user_selected_context_change);
 
   membuf_object_type.tp_new = PyType_GenericNew;
   if (PyType_Ready (&membuf_object_type) < 0)
@@ -114,6 +114,34 @@ create_memory_changed_event_object (CORE_ADDR addr, ssize_t len)
   return event;
 }
 
+/* Construct a gdb.ParamChangedEvent describing the parameter PARAM,
+   which was set to VALUE.  */
+
+static gdbpy_ref<>
+create_param_changed_event_object (const char *param, const char *value)
+{
+  gdbpy_ref<> event = create_event_object (&param_changed_event_object_type);
+
+  if (event == NULL)
+    return NULL;
+
+  gdbpy_ref<> param_obj (PyString_FromString (param));
+  if (param_obj == NULL)
+    return NULL;
+
+  if (evpy_add_attribute (event.get (), "param", param_obj.get ()) < 0)
+    return NULL;
+
+  gdbpy_ref<> value_obj (PyString_FromString (value));
+  if (value_obj == NULL)
+    return NULL;
+
+  if (evpy_add_attribute (event.get (), "value", value_obj.get ()) < 0)
+    return NULL;
+
+  return event;
+}
+
 /* Callback function which notifies observers when an event occurs which
    calls a function in the inferior.
    This function will create a new Python inferior-call event object.
@@ -161,3 +189,18 @@ emit_register_changed_event (struct frame_info* frame, int regnum)
     return evpy_emit_event (event.get (), gdb_py_events.register_changed);
   return -1;
 }
+
+/* Callback when a parameter is changed by a 'set' command.  This
+   function will create a new Python parameter changed event object.  */
+
+int
+emit_param_changed_event (const char *param, const char *value)
+{
+  if (evregpy_no_listeners_p (gdb_py_events.param_changed))
+    return 0;
+
+  gdbpy_ref<> event = create_param_changed_event_object (param, value);
+  if (event != NULL)
+    return evpy_emit_event (event.get (), gdb_py_events.param_changed);
+  return -1;
+}
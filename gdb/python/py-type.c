@@ -1034,6 +1034,35 @@ typy_richcompare (PyObject *self, PyObject *other, int op)
   Py_RETURN_FALSE;
 }
 
+/* Implement the hash method.  Types which compare equal must hash to
+   the same value, so only the properties which types_deeply_equal
+   compares after resolving typedefs are used.  */
+
+static Py_hash_t
+typy_hash (PyObject *self)
+{
+  struct type *type = ((type_object *) self)->type;
+  Py_hash_t result;
+
+  try
+    {
+      type = check_typedef (type);
+      result = TYPE_CODE (type);
+      if (TYPE_NAME (type) != NULL)
+	result = result * 31 + htab_hash_string (TYPE_NAME (type));
+    }
+  catch (const gdb_exception &except)
+    {
+      gdbpy_convert_exception (except);
+      return -1;
+    }
+
+  /* -1 is reserved to signal an error.  */
+  if (result == -1)
+    result = -2;
+  return result;
+}
+
 
 
 static const struct objfile_data *typy_objfile_data_key;
@@ -1581,7 +1610,7 @@ PyTypeObject type_object_type =
   &type_object_as_number,	  /*tp_as_number*/
   0,				  /*tp_as_sequence*/
   &typy_mapping,		  /*tp_as_mapping*/
-  0,				  /*tp_hash */
+  typy_hash,			  /*tp_hash */
   0,				  /*tp_call*/
   typy_str,			  /*tp_str*/
   0,				  /*tp_getattro*/
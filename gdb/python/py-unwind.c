@@ -28,6 +28,7 @@
 #include "regcache.h"
 #include "valprint.h"
 #include "user-regs.h"
+#include "gdbsupport/scope-exit.h"
 
 #define TRACE_PY_UNWIND(level, args...) if (pyuw_debug >= level)  \
   { fprintf_unfiltered (gdb_stdlog, args); }
@@ -41,6 +42,13 @@ typedef struct
 
   /* Its architecture, passed by the sniffer caller.  */
   struct gdbarch *gdbarch;
+
+  /* Dictionary mapping register numbers to the gdb.Value objects
+     already read from this frame, or NULL if no register has been
+     read yet.  Unwinders run in turn on the same pending frame and
+     typically all look at the same few registers (SP, PC, FP), so
+     each register is only fetched once.  */
+  PyObject *registers;
 } pending_frame_object;
 
 /* Saved registers array item.  */
@@ -357,29 +365,36 @@ pending_framepy_str (PyObject *self)
   return PyString_FromFormat ("SP=%s,PC=%s", sp_str, pc_str);
 }
 
-/* Implementation of gdb.PendingFrame.read_register (self, reg) -> gdb.Value.
-   Returns the value of register REG as gdb.Value instance.  */
+/* Return the value of the register identified by PYO_REG_ID in
+   PENDING_FRAME as a new reference to a gdb.Value instance, reusing
+   the value read earlier from the same pending frame if there is one.
+   Sets Python error and returns NULL on error.  */
 
 static PyObject *
-pending_framepy_read_register (PyObject *self, PyObject *args)
+pending_framepy_read_register_1 (pending_frame_object *pending_frame,
+				 PyObject *pyo_reg_id)
 {
-  pending_frame_object *pending_frame = (pending_frame_object *) self;
   struct value *val = NULL;
   int regnum;
-  PyObject *pyo_reg_id;
 
-  if (pending_frame->frame_info == NULL)
+  if (!pyuw_parse_register_id (pending_frame->gdbarch, pyo_reg_id, &regnum))
     {
-      PyErr_SetString (PyExc_ValueError,
-                       "Attempting to read register from stale PendingFrame");
+      PyErr_SetString (PyExc_ValueError, "Bad register");
       return NULL;
     }
-  if (!PyArg_UnpackTuple (args, "read_register", 1, 1, &pyo_reg_id))
+
+  gdbpy_ref<> key (PyInt_FromLong (regnum));
+  if (key == NULL)
     return NULL;
-  if (!pyuw_parse_register_id (pending_frame->gdbarch, pyo_reg_id, &regnum))
+  if (pending_frame->registers != NULL)
     {
-      PyErr_SetString (PyExc_ValueError, "Bad register");
-      return NULL;
+      PyObject *cached = PyDict_GetItem (pending_frame->registers, key.get ());
+
+      if (cached != NULL)
+	{
+	  Py_INCREF (cached);
+	  return cached;
+	}
     }
 
   try
@@ -400,7 +415,101 @@ pending_framepy_read_register (PyObject *self, PyObject *args)
       GDB_PY_HANDLE_EXCEPTION (except);
     }
 
-  return val == NULL ? NULL : value_to_value_object (val);
+  if (val == NULL)
+    return NULL;
+
+  gdbpy_ref<> result (value_to_value_object (val));
+  if (result == NULL)
+    return NULL;
+
+  if (pending_frame->registers == NULL)
+    {
+      pending_frame->registers = PyDict_New ();
+      if (pending_frame->registers == NULL)
+	return NULL;
+    }
+  if (PyDict_SetItem (pending_frame->registers, key.get (),
+		      result.get ()) < 0)
+    return NULL;
+
+  return result.release ();
+}
+
+/* Implementation of gdb.PendingFrame.read_register (self, reg) -> gdb.Value.
+   Returns the value of register REG as gdb.Value instance.  */
+
+static PyObject *
+pending_framepy_read_register (PyObject *self, PyObject *args)
+{
+  pending_frame_object *pending_frame = (pending_frame_object *) self;
+  PyObject *pyo_reg_id;
+
+  if (pending_frame->frame_info == NULL)
+    {
+      PyErr_SetString (PyExc_ValueError,
+                       "Attempting to read register from stale PendingFrame");
+      return NULL;
+    }
+  if (!PyArg_UnpackTuple (args, "read_register", 1, 1, &pyo_reg_id))
+    return NULL;
+
+  return pending_framepy_read_register_1 (pending_frame, pyo_reg_id);
+}
+
+/* Implementation of
+   gdb.PendingFrame.read_registers (self, regs) -> (gdb.Value, ...).
+   Returns the values of all the registers in the sequence REGS as a
+   tuple of gdb.Value instances, in the same order.  */
+
+static PyObject *
+pending_framepy_read_registers (PyObject *self, PyObject *args)
+{
+  pending_frame_object *pending_frame = (pending_frame_object *) self;
+  PyObject *pyo_regs;
+
+  if (pending_frame->frame_info == NULL)
+    {
+      PyErr_SetString (PyExc_ValueError,
+                       "Attempting to read registers from stale PendingFrame");
+      return NULL;
+    }
+  if (!PyArg_UnpackTuple (args, "read_registers", 1, 1, &pyo_regs))
+    return NULL;
+
+  gdbpy_ref<> seq (PySequence_Fast (pyo_regs,
+				    _("Registers must be a sequence.")));
+  if (seq == NULL)
+    return NULL;
+
+  Py_ssize_t count = PySequence_Fast_GET_SIZE (seq.get ());
+  gdbpy_ref<> result (PyTuple_New (count));
+  if (result == NULL)
+    return NULL;
+
+  for (Py_ssize_t i = 0; i < count; ++i)
+    {
+      PyObject *pyo_reg_id = PySequence_Fast_GET_ITEM (seq.get (), i);
+      PyObject *value = pending_framepy_read_register_1 (pending_frame,
+							  pyo_reg_id);
+
+      if (value == NULL)
+	return NULL;
+      /* PyTuple_SET_ITEM steals the reference.  */
+      PyTuple_SET_ITEM (result.get (), i, value);
+    }
+
+  return result.release ();
+}
+
+/* PendingFrame cleanup.  */
+
+static void
+pending_framepy_dealloc (PyObject *self)
+{
+  pending_frame_object *pending_frame = (pending_frame_object *) self;
+
+  Py_XDECREF (pending_frame->registers);
+  Py_TYPE (self)->tp_free (self);
 }
 
 /* Implementation of
@@ -502,9 +611,15 @@ pyuw_sniffer (const struct frame_unwind *self, struct frame_info *this_frame,
       return 0;
     }
   pfo->gdbarch = gdbarch;
+  pfo->registers = NULL;
   scoped_restore invalidate_frame = make_scoped_restore (&pfo->frame_info,
 							 this_frame);
 
+  /* Register values read by the unwinders are only valid while the
+     frame is being sniffed; drop them once the PendingFrame goes
+     stale.  */
+  SCOPE_EXIT { Py_CLEAR (pfo->registers); };
+
   /* Run unwinders.  */
   if (gdb_python_module == NULL
       || ! PyObject_HasAttrString (gdb_python_module, "_execute_unwinders"))
@@ -666,6 +781,10 @@ static PyMethodDef pending_frame_object_methods[] =
   { "read_register", pending_framepy_read_register, METH_VARARGS,
     "read_register (REG) -> gdb.Value\n"
     "Return the value of the REG in the frame." },
+  { "read_registers", pending_framepy_read_registers, METH_VARARGS,
+    "read_registers (REGS) -> (gdb.Value, ...)\n"
+    "Return the values of all the registers in the sequence REGS\n"
+    "in the frame, as a tuple." },
   { "create_unwind_info",
     pending_framepy_create_unwind_info, METH_VARARGS,
     "create_unwind_info (FRAME_ID) -> gdb.UnwindInfo\n"
@@ -680,7 +799,7 @@ PyTypeObject pending_frame_object_type =
   "gdb.PendingFrame",             /* tp_name */
   sizeof (pending_frame_object),  /* tp_basicsize */
   0,                              /* tp_itemsize */
-  0,                              /* tp_dealloc */
+  pending_framepy_dealloc,        /* tp_dealloc */
   0,                              /* tp_print */
   0,                              /* tp_getattr */
   0,                              /* tp_setattr */
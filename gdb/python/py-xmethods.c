@@ -20,22 +20,21 @@
 #include "defs.h"
 #include "arch-utils.h"
 #include "extension-priv.h"
-#include "objfiles.h"
 #include "value.h"
 #include "language.h"
 
 #include "python.h"
 #include "python-internal.h"
 
-static const char enabled_field_name[] = "enabled";
-static const char match_method_name[] = "match";
 static const char get_arg_types_method_name[] = "get_arg_types";
 static const char get_result_type_method_name[] = "get_result_type";
-static const char matchers_attr_str[] = "xmethods";
 
-static PyObject *py_match_method_name = NULL;
 static PyObject *py_get_arg_types_method_name = NULL;
 
+/* The gdb.xmethod._get_match_results function.  */
+
+static PyObject *py_get_match_results = NULL;
+
 struct python_xmethod_worker : xmethod_worker
 {
   python_xmethod_worker (PyObject *worker, PyObject *this_type);
@@ -75,41 +74,27 @@ python_xmethod_worker::~python_xmethod_worker ()
   Py_DECREF (m_this_type);
 }
 
-/* Invoke the "match" method of the MATCHER and return a new reference
-   to the result.  Returns NULL on error.  */
+/* Return a borrowed reference to the gdb.xmethod._get_match_results
+   function, or NULL with a Python exception set on error.  The
+   gdb.xmethod module cannot be imported by gdbpy_initialize_xmethods,
+   which runs before the gdb module is set up, so the function is
+   looked up when it is first needed and kept for the next method
+   lookups.  */
 
 static PyObject *
-invoke_match_method (PyObject *matcher, PyObject *py_obj_type,
-		     const char *xmethod_name)
+get_match_results_function ()
 {
-  int enabled;
-
-  gdbpy_ref<> enabled_field (PyObject_GetAttrString (matcher,
-						     enabled_field_name));
-  if (enabled_field == NULL)
-    return NULL;
-
-  enabled = PyObject_IsTrue (enabled_field.get ());
-  if (enabled == -1)
-    return NULL;
-  if (enabled == 0)
+  if (py_get_match_results == NULL)
     {
-      /* Return 'None' if the matcher is not enabled.  */
-      Py_RETURN_NONE;
-    }
-
-  gdbpy_ref<> match_method (PyObject_GetAttrString (matcher,
-						    match_method_name));
-  if (match_method == NULL)
-    return NULL;
+      gdbpy_ref<> xmethod_module (PyImport_ImportModule ("gdb.xmethod"));
+      if (xmethod_module == NULL)
+	return NULL;
 
-  gdbpy_ref<> py_xmethod_name (PyString_FromString (xmethod_name));
-  if (py_xmethod_name == NULL)
-    return NULL;
+      py_get_match_results
+	= PyObject_GetAttrString (xmethod_module.get (), "_get_match_results");
+    }
 
-  return PyObject_CallMethodObjArgs (matcher, py_match_method_name,
-				     py_obj_type, py_xmethod_name.get (),
-				     NULL);
+  return py_get_match_results;
 }
 
 /* Implementation of get_matching_xmethod_workers for Python.  */
@@ -131,90 +116,33 @@ gdbpy_get_matching_xmethod_workers
       return EXT_LANG_RC_ERROR;
     }
 
-  /* Create an empty list of debug methods.  */
-  gdbpy_ref<> py_xmethod_matcher_list (PyList_New (0));
-  if (py_xmethod_matcher_list == NULL)
+  /* The matchers are looked up and invoked by the
+     gdb.xmethod._get_match_results function, which returns the list of
+     their non-None results.  */
+  PyObject *get_match_results = get_match_results_function ();
+  if (get_match_results == NULL)
     {
       gdbpy_print_stack ();
       return EXT_LANG_RC_ERROR;
     }
 
-  /* Gather debug method matchers registered with the object files.
-     This could be done differently by iterating over each objfile's matcher
-     list individually, but there's no data yet to show it's needed.  */
-  for (objfile *objfile : current_program_space->objfiles ())
-    {
-      gdbpy_ref<> py_objfile = objfile_to_objfile_object (objfile);
-
-      if (py_objfile == NULL)
-	{
-	  gdbpy_print_stack ();
-	  return EXT_LANG_RC_ERROR;
-	}
-
-      gdbpy_ref<> objfile_matchers (objfpy_get_xmethods (py_objfile.get (),
-							 NULL));
-      gdbpy_ref<> temp (PySequence_Concat (py_xmethod_matcher_list.get (),
-					   objfile_matchers.get ()));
-      if (temp == NULL)
-	{
-	  gdbpy_print_stack ();
-	  return EXT_LANG_RC_ERROR;
-	}
-
-      py_xmethod_matcher_list = std::move (temp);
-    }
-
-  /* Gather debug methods matchers registered with the current program
-     space.  */
-  gdbpy_ref<> py_progspace = pspace_to_pspace_object (current_program_space);
-  if (py_progspace != NULL)
-    {
-      gdbpy_ref<> pspace_matchers (pspy_get_xmethods (py_progspace.get (),
-						      NULL));
-
-      gdbpy_ref<> temp (PySequence_Concat (py_xmethod_matcher_list.get (),
-					   pspace_matchers.get ()));
-      if (temp == NULL)
-	{
-	  gdbpy_print_stack ();
-	  return EXT_LANG_RC_ERROR;
-	}
-
-      py_xmethod_matcher_list = std::move (temp);
-    }
-  else
+  gdbpy_ref<> py_method_name (PyString_FromString (method_name));
+  if (py_method_name == NULL)
     {
       gdbpy_print_stack ();
       return EXT_LANG_RC_ERROR;
     }
 
-  /* Gather debug method matchers registered globally.  */
-  if (gdb_python_module != NULL
-      && PyObject_HasAttrString (gdb_python_module, matchers_attr_str))
+  gdbpy_ref<> match_results
+    (PyObject_CallFunctionObjArgs (get_match_results, py_type.get (),
+				   py_method_name.get (), NULL));
+  if (match_results == NULL)
     {
-      gdbpy_ref<> gdb_matchers (PyObject_GetAttrString (gdb_python_module,
-							matchers_attr_str));
-      if (gdb_matchers != NULL)
-	{
-	  gdbpy_ref<> temp (PySequence_Concat (py_xmethod_matcher_list.get (),
-					       gdb_matchers.get ()));
-	  if (temp == NULL)
-	    {
-	      gdbpy_print_stack ();
-	      return EXT_LANG_RC_ERROR;
-	    }
-
-	  py_xmethod_matcher_list = std::move (temp);
-	}
-      else
-	{
-	  gdbpy_print_stack ();
-	  return EXT_LANG_RC_ERROR;
-	}
+      gdbpy_print_stack ();
+      return EXT_LANG_RC_ERROR;
     }
 
-  gdbpy_ref<> list_iter (PyObject_GetIter (py_xmethod_matcher_list.get ()));
+  gdbpy_ref<> list_iter (PyObject_GetIter (match_results.get ()));
   if (list_iter == NULL)
     {
       gdbpy_print_stack ();
@@ -222,8 +150,8 @@ gdbpy_get_matching_xmethod_workers
     }
   while (true)
     {
-      gdbpy_ref<> matcher (PyIter_Next (list_iter.get ()));
-      if (matcher == NULL)
+      gdbpy_ref<> match_result (PyIter_Next (list_iter.get ()));
+      if (match_result == NULL)
 	{
 	  if (PyErr_Occurred ())
 	    {
@@ -233,18 +161,7 @@ gdbpy_get_matching_xmethod_workers
 	  break;
 	}
 
-      gdbpy_ref<> match_result (invoke_match_method (matcher.get (),
-						     py_type.get (),
-						     method_name));
-
-      if (match_result == NULL)
-	{
-	  gdbpy_print_stack ();
-	  return EXT_LANG_RC_ERROR;
-	}
-      if (match_result == Py_None)
-	; /* This means there was no match.  */
-      else if (PySequence_Check (match_result.get ()))
+      if (PySequence_Check (match_result.get ()))
 	{
 	  gdbpy_ref<> iter (PyObject_GetIter (match_result.get ()));
 
@@ -601,10 +518,6 @@ python_xmethod_worker::python_xmethod_worker (PyObject *py_worker,
 int
 gdbpy_initialize_xmethods (void)
 {
-  py_match_method_name = PyString_FromString (match_method_name);
-  if (py_match_method_name == NULL)
-    return -1;
-
   py_get_arg_types_method_name
     = PyString_FromString (get_arg_types_method_name);
   if (py_get_arg_types_method_name == NULL)
@@ -2020,6 +2020,9 @@ Return the newest frame object." },
   { "selected_frame", gdbpy_selected_frame, METH_NOARGS,
     "selected_frame () -> gdb.Frame.\n\
 Return the selected frame object." },
+  { "frame_cache_generation", gdbpy_frame_cache_generation, METH_NOARGS,
+    "frame_cache_generation () -> Integer.\n\
+Return a number which changes each time the frame cache is flushed." },
   { "frame_stop_reason_string", gdbpy_frame_stop_reason_string, METH_VARARGS,
     "stop_reason_string (Integer) -> String.\n\
 Return a string explaining unwind stop reason." },
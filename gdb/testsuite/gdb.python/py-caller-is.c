@@ -27,10 +27,17 @@ middle_func (void)
   bottom_func ();
 }
 
+static void
+other_middle_func (void)
+{
+  bottom_func ();
+}
+
 static void
 top_func (void)
 {
   middle_func ();
+  other_middle_func ();
 }
 
 int
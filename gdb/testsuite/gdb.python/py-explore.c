@@ -46,6 +46,29 @@ union ComplexUnion
   struct SimpleStruct sa[ARRAY_SIZE];
 };
 
+struct Node
+{
+  int value;
+  struct Node *next;
+};
+
+extern struct Node node_b;
+struct Node node_a = { 1, &node_b };
+struct Node node_b = { 2, &node_a };
+
+struct Pair
+{
+  struct Node *first;
+  struct Node *second;
+};
+
+struct Pair pair = { &node_a, &node_a };
+
+/* The first pointer designates memory which cannot be read.  */
+struct Pair bad_pair = { (struct Node *) 8, &node_b };
+
+int iarray[30] = { 3, 1, 4, 1, 5, 9, 2, 6 };
+
 int
 main (void)
 {
@@ -28,6 +28,11 @@ class B : public A {
   char c;
 };
 
+class C : public B {
+ public:
+  int j;
+};
+
 typedef int *int_ptr;
 
 int
@@ -38,9 +43,11 @@ func (const A &a)
   int_ptr ptr = &val;
   int_ptr &int_ptr_ref = ptr;
   B b;
+  C c;
 
   b.i = 10;
   b.c = 'a';
+  c.j = 20;
 
   return 0; /* Break here.  */
 }
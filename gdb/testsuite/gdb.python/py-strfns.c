@@ -18,11 +18,16 @@
 const char str1[] = "Hello.";
 const char str2[] = "Hello.";
 const char str3[] = "Goodbye.";
+/* E acute, t, e acute, in UTF-8.  */
+const char utf8[] = "\303\251t\303\251";
 
 const char buf1[] = { 0, 1, 2, 3 };
 const char buf2[] = { 0, 1, 2, 3 };
 const char buf3[] = { 0, 1, 2, 4 };
 
+char big1[10000];
+char big2[10000];
+
 static void
 func (const char *arg)
 {
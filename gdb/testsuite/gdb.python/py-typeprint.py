@@ -28,8 +28,10 @@ class StringTypePrinter(object):
     def __init__(self):
         self.name = 'string'
         self.enabled = True
+        self.instantiations = 0
 
     def instantiate(self):
+        self.instantiations += 1
         return Recognizer()
 
 gdb.type_printers.append(StringTypePrinter())
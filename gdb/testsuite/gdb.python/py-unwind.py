@@ -83,9 +83,12 @@ class TestUnwinder(Unwinder):
             previous_ip = self._read_word(bp + 8)
             previous_sp = bp + 16
 
-            frame_id = FrameId(
-                pending_frame.read_register(TestUnwinder.AMD64_RSP),
-                pending_frame.read_register(TestUnwinder.AMD64_RIP))
+            sp, ip = pending_frame.read_registers([TestUnwinder.AMD64_RSP,
+                                                   TestUnwinder.AMD64_RIP])
+            # Registers read earlier come back from the pending frame's
+            # cache.
+            assert pending_frame.read_register(TestUnwinder.AMD64_RSP) is sp
+            frame_id = FrameId(sp, ip)
             unwind_info = pending_frame.create_unwind_info(frame_id)
             unwind_info.add_saved_register(TestUnwinder.AMD64_RBP,
                                            previous_bp)
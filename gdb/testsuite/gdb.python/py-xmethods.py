@@ -92,6 +92,9 @@ class E_method_matcher(XMethodMatcher):
     def __init__(self):
         XMethodMatcher.__init__(self, 'E_methods')
         self.methods = [XMethod('method_int'), XMethod('method_char')]
+        # Let GDB consult this matcher only for dop::E::method.
+        self.class_names = ['dop::E']
+        self.method_names = ['method']
 
     def match(self, class_type, method_name):
         class_tag = class_type.unqualified().tag
@@ -219,14 +222,16 @@ global_dm_list = [
                          r'^getarrayind$',
                          A_getarrayind,
                          type_int),
+    # The class and method matchers can also be compiled regular
+    # expressions, or sequences of exact names.
     SimpleXMethodMatcher(r'A_indexoper',
                          r'^dop::A$',
-                         r'operator\[\]',
+                         re.compile(r'operator\[\]'),
                          A_indexoper,
                          type_int),
     SimpleXMethodMatcher(r'B_indexoper',
-                         r'^dop::B$',
-                         r'operator\[\]',
+                         ['dop::B'],
+                         ['operator[]'],
                          B_indexoper,
                          type_int)
 ]